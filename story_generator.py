@@ -14,15 +14,24 @@ import json
 import argparse
 import asyncio
 import logging
+import logging.handlers
+import queue
+import threading
+import atexit
 import traceback
 import importlib.util
-from typing import Dict, List, Optional, Any, Tuple
-from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from dataclasses import dataclass, asdict
 from pathlib import Path
 import configparser
 import random
 import time
+import datetime
 import uuid
+import hashlib
+import string
+import gzip
+from types import MappingProxyType
 
 # Gerekli kütüphaneleri içe aktarma
 try:
@@ -30,10 +39,12 @@ try:
     import google.generativeai as genai
     from google.generativeai.types import content_types
     from google.generativeai.types import generation_types
+    from google.generativeai import caching
     import numpy as np
-    from faiss import IndexFlatL2
+    import faiss
     import markdown
     from tqdm import tqdm
+    from google.api_core import exceptions as api_exceptions
 except ImportError as e:
     print(f"Gerekli kütüphaneler yüklenmemiş: {e}")
     print("Lütfen şu komutu çalıştırın: pip install -r requirements.txt")
@@ -51,18 +62,72 @@ try:
 except:
     print("WeasyPrint kontrol edilirken hata oluştu. PDF oluşturma için Pandoc kullanılacak.")
 
+# FAISS GPU kullanılabilirlik kontrolü (faiss-gpu kurulu ve GPU varsa)
+HAS_FAISS_GPU = hasattr(faiss, "StandardGpuResources") and faiss.get_num_gpus() > 0
+_faiss_gpu_resources = None
+
+# Kota ve geçici sunucu hatalarında bekleyip yeniden denenecek API hataları
+RETRYABLE_API_ERRORS = (
+    api_exceptions.ResourceExhausted,
+    api_exceptions.DeadlineExceeded,
+    api_exceptions.ServiceUnavailable,
+    api_exceptions.InternalServerError,
+)
+
+# Bağlam önbelleğinin süresi dolduğunda veya silindiğinde önbellekli modelin verdiği hatalar
+CONTEXT_CACHE_ERRORS = (
+    api_exceptions.NotFound,
+    api_exceptions.PermissionDenied,
+)
+
+# Bağlam önbelleğinin yaşam süresi; her ilerleme kaydında bu süre kadar uzatılır
+CONTEXT_CACHE_TTL_SECONDS = 3600
+
+# Embedding boyutu (text-embedding-004) ve tek istekte gönderilebilecek metin sayısı
+EMBEDDING_DIM = 768
+EMBEDDING_BATCH_SIZE = 100
+
+# Yanıt önbelleğinde bu boyuttan (bayt) büyük yanıtlar gzip ile sıkıştırılarak saklanır
+RESPONSE_CACHE_COMPRESS_THRESHOLD = 32 * 1024
+
+# orjson kullanılabilirlik kontrolü (daha hızlı JSON yazımı, yoksa standart json kullanılır)
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# mistune kullanılabilirlik kontrolü (daha hızlı Markdown -> HTML, yoksa markdown paketi kullanılır)
+try:
+    import mistune
+    HAS_MISTUNE = True
+except ImportError:
+    HAS_MISTUNE = False
+
 # .env dosyasını yükle
 load_dotenv()
 
 # Loglama yapılandırması
+# Dosya/konsol yazımı olay döngüsünü bloklamasın diye gerçek işleyiciler
+# ayrı bir iş parçacığında (QueueListener) çalışır; döngü yalnızca kuyruğa ekler.
 log_level = os.getenv('LOG_LEVEL', 'INFO')
+log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+log_handlers = [
+    logging.StreamHandler(),
+    logging.FileHandler("story_generator.log")
+]
+for handler in log_handlers:
+    handler.setFormatter(log_formatter)
+log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+log_listener = logging.handlers.QueueListener(log_queue, *log_handlers, respect_handler_level=True)
+log_listener.start()
+atexit.register(log_listener.stop)
+queue_handler = logging.handlers.QueueHandler(log_queue)
+# Asıl biçimlendirme dinleyicideki işleyicilerde yapılır
+queue_handler.setFormatter(logging.Formatter('%(message)s'))
 logging.basicConfig(
     level=getattr(logging, log_level),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler("story_generator.log")
-    ]
+    handlers=[queue_handler]
 )
 logger = logging.getLogger("StoryGenerator")
 
@@ -77,7 +142,6 @@ class Character:
     background: str
     relationships: Dict[str, str]
     story_arc: str
-    vector: Optional[np.ndarray] = None
 
 @dataclass
 class Location:
@@ -87,7 +151,6 @@ class Location:
     description: str
     importance: str
     connected_locations: List[str]
-    vector: Optional[np.ndarray] = None
 
 @dataclass
 class Event:
@@ -100,7 +163,6 @@ class Event:
     preceding_events: List[str]
     following_events: List[str]
     chapter: int
-    vector: Optional[np.ndarray] = None
 
 @dataclass
 class Chapter:
@@ -125,37 +187,295 @@ class StoryConfig:
     tone: str = "Dengeli"
     character_complexity: str = "Karmaşık"
 
+# Evren oluşturma başarısız olduğunda kullanılan varsayılan karakterler ve konumlar
+_DEFAULT_CHARACTERS = tuple(MappingProxyType(data) for data in (
+    {
+        "name": "Ana Kahraman",
+        "description": "Hikayenin ana kahramanı, cesur ve kararlı bir karakter.",
+        "traits": ("Cesur", "Kararlı", "Dürüst"),
+        "background": "Sıradan bir hayattan maceraya atılan genç.",
+        "relationships": MappingProxyType({}),
+        "story_arc": "Kahramanın yolculuğu"
+    },
+    {
+        "name": "Akıl Hocası",
+        "description": "Kahramana yol gösteren bilge karakter.",
+        "traits": ("Bilge", "Gizemli", "Yardımsever"),
+        "background": "Uzun yıllar boyunca bilgi biriktirmiş yaşlı bir rehber.",
+        "relationships": MappingProxyType({"Ana Kahraman": "Rehber ve öğretmen"}),
+        "story_arc": "Kahramana rehberlik etme"
+    },
+    {
+        "name": "Rakip",
+        "description": "Kahramanın yoluna çıkan güçlü rakip.",
+        "traits": ("Hırslı", "Zeki", "Rekabetçi"),
+        "background": "Kendi hedefleri için mücadele eden güçlü karakter.",
+        "relationships": MappingProxyType({"Ana Kahraman": "Rakip"}),
+        "story_arc": "Rekabet ve çatışma"
+    },
+))
+
+_DEFAULT_LOCATIONS = tuple(MappingProxyType(data) for data in (
+    {"name": "Ana Şehir", "description": "Hikayenin ana mekanı olan büyük şehir", "importance": "Merkezi", "connected_locations": ()},
+    {"name": "Orman", "description": "Şehrin dışındaki geniş ve gizemli orman", "importance": "Önemli", "connected_locations": ()},
+    {"name": "Dağlar", "description": "Ufukta yükselen heybetli dağlar", "importance": "Arka plan", "connected_locations": ()},
+))
+
+def _default_characters() -> List[Character]:
+    """Varsayılan karakter tanımlarından yeni Character nesneleri oluşturur."""
+    return [
+        Character(
+            id=str(uuid.uuid4()),
+            name=char_data["name"],
+            description=char_data["description"],
+            traits=list(char_data["traits"]),
+            background=char_data["background"],
+            relationships=dict(char_data["relationships"]),
+            story_arc=char_data["story_arc"]
+        )
+        for char_data in _DEFAULT_CHARACTERS
+    ]
+
+def _default_locations() -> List[Location]:
+    """Varsayılan konum tanımlarından yeni Location nesneleri oluşturur."""
+    return [
+        Location(
+            id=str(uuid.uuid4()),
+            name=loc_data["name"],
+            description=loc_data["description"],
+            importance=loc_data["importance"],
+            connected_locations=list(loc_data["connected_locations"])
+        )
+        for loc_data in _DEFAULT_LOCATIONS
+    ]
+
 class GeminiClient:
     """Gemini API ile etkileşim için istemci sınıfı."""
     
-    def __init__(self, api_key: str):
-        """Gemini API istemcisini başlatır."""
+    def __init__(self, api_key: str, response_cache_dir: Optional[str] = "backup/llm_cache"):
+        """Gemini API istemcisini başlatır; response_cache_dir None ise yanıt önbelleği kapalıdır."""
+        # Asenkron çağrılar SDK'nın paylaşılan grpc_asyncio istemcisini kullanır (tek kalıcı kanal);
+        # global transport ayarlanmaz çünkü bağlam önbelleği senkron istemciyle oluşturuluyor
         genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-1.5-pro')
+        self.model_name = 'gemini-1.5-pro'
+        self.model = genai.GenerativeModel(self.model_name)
+        # Gecikmeye duyarlı olmayan çağrılar (taslak, JSON onarımı, başlık, ön söz, ek) için isteğe bağlı
+        # daha ucuz model; kalite farkı yaratmaması için varsayılan olarak ana model kullanılır
+        self.flex_model_name = os.getenv('GEMINI_FLEX_MODEL') or self.model_name
+        if self.flex_model_name == self.model_name:
+            self.flex_model = self.model
+        else:
+            self.flex_model = genai.GenerativeModel(self.flex_model_name)
+        # Paylaşılan bağlam (hikaye özeti, karakterler, konumlar) için Gemini bağlam önbelleği
+        self.context_cache = None
+        self.cached_model = None
+        # Bağlam önbelleğine yüklenen içeriğin özeti (yanıt önbelleği anahtarına katılır)
+        self._context_cache_key = ""
+        # Önbellek kullanılamaz hale gelirse istemlere satır içi eklenecek bağlam
+        self._context_cache_contents: List[str] = []
+        # İstem özetine göre diskte tutulan yanıt önbelleği (yeniden denemeler ve yarıda kalan çalıştırmalar için)
+        self.response_cache_dir = response_cache_dir
+        if response_cache_dir:
+            os.makedirs(response_cache_dir, exist_ok=True)
+        self.embedding_model = os.getenv('EMBEDDING_MODEL', 'models/text-embedding-004')
         self.temperature = float(os.getenv('TEMPERATURE', '0.7'))
         self.max_tokens = int(os.getenv('MAX_TOKENS', '4096'))
+        self.max_retries = max(1, int(os.getenv('GEMINI_MAX_RETRIES', '5')))
+        # Eşzamanlı istekleri sınırla (RPM limitlerine takılmamak için)
+        self._sem = asyncio.Semaphore(int(os.getenv('GEMINI_MAX_CONCURRENCY', '10')))
+        
+    async def _call_with_backoff(self, func, *args, **kwargs):
+        """API çağrısını semafor altında çalıştırır, geçici hatalarda üstel bekleme ile yeniden dener.
+        
+        Asenkron fonksiyonlar doğrudan beklenir; yalnızca senkron olanlar iş parçacığına aktarılır.
+        """
+        is_async = asyncio.iscoroutinefunction(func)
+        for attempt in range(self.max_retries):
+            try:
+                async with self._sem:
+                    if is_async:
+                        return await func(*args, **kwargs)
+                    return await asyncio.to_thread(func, *args, **kwargs)
+            except RETRYABLE_API_ERRORS as e:
+                if attempt == self.max_retries - 1:
+                    logger.error(f"Gemini API hatası, deneme hakkı tükendi: {e}")
+                    raise
+                # Üstel bekleme + rastgele sapma (jitter)
+                delay = min(30, 2 ** attempt) + random.random()
+                logger.warning(f"Gemini API geçici hatası ({attempt + 1}/{self.max_retries}): {e}. {delay:.1f} saniye sonra tekrar deneniyor...")
+                await asyncio.sleep(delay)
+        
+    async def create_context_cache(self, contents: List[str], ttl_seconds: int = CONTEXT_CACHE_TTL_SECONDS) -> bool:
+        """Sık tekrarlanan bağlamı Gemini bağlam önbelleğine yükler; başarılıysa True döndürür."""
+        try:
+            self.context_cache = await self._call_with_backoff(
+                caching.CachedContent.create,
+                model=self.model_name,
+                display_name="story-generator-context",
+                contents=contents,
+                ttl=datetime.timedelta(seconds=ttl_seconds)
+            )
+            self.cached_model = genai.GenerativeModel.from_cached_content(self.context_cache)
+            self._context_cache_key = hashlib.sha256("\0".join(contents).encode('utf-8')).hexdigest()
+            self._context_cache_contents = list(contents)
+            logger.info(f"Bağlam önbelleği oluşturuldu: {self.context_cache.name}")
+            return True
+        except Exception as e:
+            # Bağlam, önbellek için gereken en az token sayısının altında olabilir
+            logger.warning(f"Bağlam önbelleği oluşturulamadı, bağlam istemlerde gönderilecek: {e}")
+            self.context_cache = None
+            self.cached_model = None
+            return False
+    
+    def _drop_context_cache(self) -> None:
+        """Kullanılamayan bağlam önbelleğini bırakır; sonraki istekler bağlamı satır içi gönderir."""
+        self.context_cache = None
+        self.cached_model = None
+        self._context_cache_key = ""
+    
+    async def refresh_context_cache(self, ttl_seconds: int = CONTEXT_CACHE_TTL_SECONDS) -> None:
+        """Bağlam önbelleğinin yaşam süresini uzatır (uzun çalıştırmalarda süresinin dolmaması için)."""
+        if self.context_cache is None:
+            return
+        try:
+            await self._call_with_backoff(self.context_cache.update, ttl=datetime.timedelta(seconds=ttl_seconds))
+            logger.debug(f"Bağlam önbelleği süresi uzatıldı: {ttl_seconds} saniye")
+        except CONTEXT_CACHE_ERRORS as e:
+            logger.warning(f"Bağlam önbelleği artık kullanılamıyor, bağlam istemlerde gönderilecek: {e}")
+            self._drop_context_cache()
+        except Exception as e:
+            logger.warning(f"Bağlam önbelleği süresi uzatılamadı: {e}")
+    
+    async def delete_context_cache(self) -> None:
+        """Bağlam önbelleğini siler (depolama ücretini durdurmak için)."""
+        if self.context_cache is None:
+            return
+        try:
+            await asyncio.to_thread(self.context_cache.delete)
+            logger.info("Bağlam önbelleği silindi.")
+        except Exception as e:
+            logger.warning(f"Bağlam önbelleği silinemedi: {e}")
+        finally:
+            self._drop_context_cache()
+    
+    def _response_cache_path(self, model_name: str, prompt: str, max_tokens: int, context_key: str) -> str:
+        """İstem, model ve üretim ayarlarından yanıt önbelleği dosya yolunu üretir."""
+        key = hashlib.sha256(
+            f"{model_name}\0{context_key}\0{max_tokens}\0{self.temperature}\0{prompt}".encode('utf-8')
+        ).hexdigest()
+        return os.path.join(self.response_cache_dir, f"{key}.txt")
+    
+    @staticmethod
+    def _read_cached_response(path: str) -> Optional[str]:
+        """Önbellekteki yanıtı okur; yoksa None döndürür."""
+        try:
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    return f.read()
+            if os.path.exists(f"{path}.gz"):
+                with gzip.open(f"{path}.gz", "rt", encoding="utf-8") as f:
+                    return f.read()
+        except Exception as e:
+            logger.warning(f"Yanıt önbelleği okunamadı ({path}): {e}")
+        return None
+    
+    @staticmethod
+    def _write_cached_response(path: str, text: str) -> None:
+        """Yanıtı önbelleğe atomik olarak yazar; büyük yanıtları sıkıştırır."""
+        data = text.encode('utf-8')
+        if len(data) > RESPONSE_CACHE_COMPRESS_THRESHOLD:
+            data = gzip.compress(data)
+            path = f"{path}.gz"
+        try:
+            temp_path = f"{path}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except Exception as e:
+            logger.warning(f"Yanıt önbelleğe yazılamadı ({path}): {e}")
+    
+    async def generate_content(self, prompt: str, max_tokens: Optional[int] = None, use_context_cache: bool = False,
+                               service_tier: str = "standard", refresh_cache: bool = False,
+                               validate: Optional[Callable[[str], Any]] = None) -> str:
+        """Verilen komut ile içerik oluşturur.
+        
+        service_tier="flex" acil olmayan çağrıları GEMINI_FLEX_MODEL ile seçilen modele yönlendirir
+        (ayarlanmamışsa ana model kullanılır). Bağlam önbelleği
+        kullanılabiliyorsa öncelik onundur, çünkü önbellek ana modele bağlıdır. Aynı istem daha önce
+        yanıtlandıysa yanıt diskteki önbellekten döner; refresh_cache=True önbelleği okumadan yeni
+        yanıt ister (ör. önceki yanıt kullanılamaz çıktığında).
+        
+        validate verilirse yanıt yalnızca bu fonksiyon hata fırlatmadan kabul ettiğinde önbelleğe
+        yazılır; önbellekte kalmış geçersiz yanıtlar da okunmaz, yeniden istenir. Böylece ayrıştırılamayan
+        bir yanıt onarım denemelerinde ve sonraki çalıştırmalarda tekrar tekrar döndürülmez.
+        """
+        if use_context_cache and self.cached_model is not None:
+            model = self.cached_model
+        elif service_tier == "flex":
+            model = self.flex_model
+        else:
+            model = self.model
+        
+        uses_context_cache = self.cached_model is not None and model is self.cached_model
+        cache_path = None
+        if self.response_cache_dir:
+            context_key = self._context_cache_key if uses_context_cache else ""
+            cache_path = self._response_cache_path(model.model_name, prompt, max_tokens or self.max_tokens, context_key)
+            if not refresh_cache:
+                cached = await asyncio.to_thread(self._read_cached_response, cache_path)
+                if cached is not None and self._is_valid_response(cached, validate):
+                    logger.debug(f"Yanıt önbellekten alındı: {cache_path}")
+                    return cached
         
-    async def generate_content(self, prompt: str, max_tokens: Optional[int] = None) -> str:
-        """Verilen komut ile içerik oluşturur."""
         try:
-            max_output_tokens = max_tokens or self.max_tokens
-            response = await asyncio.to_thread(
-                self.model.generate_content,
+            text = await self._generate_uncached(model, prompt, max_tokens)
+        except CONTEXT_CACHE_ERRORS as e:
+            if not uses_context_cache:
+                raise
+            # Önbelleğin süresi dolmuş veya silinmiş; bağlamı istemin başına ekleyip yeniden gönder
+            logger.warning(f"Bağlam önbelleği kullanılamıyor, bağlam istemde gönderiliyor: {e}")
+            self._drop_context_cache()
+            inline_prompt = "\n\n".join(self._context_cache_contents + [prompt])
+            return await self.generate_content(inline_prompt, max_tokens, use_context_cache=False,
+                                               service_tier=service_tier, refresh_cache=refresh_cache,
+                                               validate=validate)
+        if cache_path and self._is_valid_response(text, validate):
+            await asyncio.to_thread(self._write_cached_response, cache_path, text)
+        return text
+    
+    @staticmethod
+    def _is_valid_response(text: str, validate: Optional[Callable[[str], Any]]) -> bool:
+        """Yanıtın çağıranın doğrulamasından geçip geçmediğini döndürür."""
+        if validate is None:
+            return True
+        try:
+            validate(text)
+            return True
+        except Exception:
+            return False
+    
+    async def _generate_uncached(self, model, prompt: str, max_tokens: Optional[int]) -> str:
+        """İçeriği API'den ister; geçici olmayan hatalarda bir kez daha düşük sıcaklıkla dener."""
+        try:
+            response = await self._call_with_backoff(
+                model.generate_content_async,
                 content_types.to_contents(prompt),
                 generation_config=generation_types.GenerationConfig(
-                    max_output_tokens=max_output_tokens,
+                    max_output_tokens=max_tokens or self.max_tokens,
                     temperature=self.temperature,
                 )
             )
             return response.text
+        except RETRYABLE_API_ERRORS + CONTEXT_CACHE_ERRORS:
+            raise
         except Exception as e:
             logger.error(f"Gemini API hatası: {e}")
             # Tekrar deneme mekanizması
             logger.info("5 saniye sonra tekrar deneniyor...")
             await asyncio.sleep(5)
             try:
-                response = await asyncio.to_thread(
-                    self.model.generate_content,
+                response = await self._call_with_backoff(
+                    model.generate_content_async,
                     content_types.to_contents(prompt),
                     generation_config=generation_types.GenerationConfig(
                         max_output_tokens=max_tokens or self.max_tokens,
@@ -166,110 +486,434 @@ class GeminiClient:
             except Exception as e2:
                 logger.error(f"İkinci deneme de başarısız: {e2}")
                 raise
+    
+    async def embed_batch(self, texts: List[str]) -> np.ndarray:
+        """Metin listesi için embedding vektörlerini toplu olarak oluşturur."""
+        embeddings = []
+        # API tek istekte en fazla EMBEDDING_BATCH_SIZE metin kabul eder
+        for start in range(0, len(texts), EMBEDDING_BATCH_SIZE):
+            response = await self._call_with_backoff(
+                genai.embed_content_async,
+                model=self.embedding_model,
+                content=texts[start:start + EMBEDDING_BATCH_SIZE],
+                task_type='SEMANTIC_SIMILARITY',
+                output_dimensionality=EMBEDDING_DIM
+            )
+            embeddings.extend(response['embedding'])
+        return np.asarray(embeddings, dtype=np.float32).reshape(len(texts), EMBEDDING_DIM)
+
+def _to_faiss_device(index):
+    """GPU varsa indeksi GPU'ya taşır; yoksa veya hata olursa CPU indeksini döndürür."""
+    global _faiss_gpu_resources
+    if not HAS_FAISS_GPU:
+        return index
+    try:
+        if _faiss_gpu_resources is None:
+            _faiss_gpu_resources = faiss.StandardGpuResources()
+        return faiss.index_cpu_to_gpu(_faiss_gpu_resources, 0, index)
+    except Exception as e:
+        logger.warning(f"FAISS indeksi GPU'ya taşınamadı, CPU kullanılacak: {e}")
+        return index
+
+def _to_faiss_cpu(index):
+    """Diske yazmak için GPU indeksini CPU kopyasına çevirir."""
+    if HAS_FAISS_GPU and isinstance(index, faiss.GpuIndex):
+        return faiss.index_gpu_to_cpu(index)
+    return index
+
+def _dump_json(data: Any, indent: bool = True) -> bytes:
+    """Veriyi UTF-8 JSON baytlarına çevirir; orjson varsa onu kullanır."""
+    if HAS_ORJSON:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(data, option=option)
+    return json.dumps(data, ensure_ascii=False, indent=2 if indent else None).encode("utf-8")
+
+def _load_json(data) -> Any:
+    """JSON metnini veya baytlarını ayrıştırır; orjson varsa onu kullanır.
+    
+    orjson.JSONDecodeError, json.JSONDecodeError'ın alt sınıfı olduğundan çağıranlar aynı hatayı yakalar.
+    """
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+class BackupWriter:
+    """Yedek dosyalarını olay döngüsünü bloklamadan arka plandaki tek bir iş parçacığında yazar."""
+    
+    def __init__(self):
+        """Yazma kuyruğunu ve iş parçacığını başlatır."""
+        self._queue: "queue.Queue[Tuple[str, bytes]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="BackupWriter", daemon=True)
+        self._thread.start()
+    
+    def submit(self, path: str, data: bytes) -> None:
+        """Dosya içeriğini yazılmak üzere kuyruğa ekler."""
+        self._queue.put((path, data))
+    
+    def flush(self) -> None:
+        """Kuyruktaki tüm yazmalar bitene kadar bekler."""
+        self._queue.join()
+    
+    def _run(self) -> None:
+        """Kuyruğu boşaltır; aynı dosyaya bekleyen birden çok yazmadan yalnızca en yenisini yazar."""
+        while True:
+            path, data = self._queue.get()
+            pending = {path: data}
+            received = 1
+            while True:
+                try:
+                    path, data = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                pending[path] = data
+                received += 1
+            
+            for path, data in pending.items():
+                try:
+                    temp_path = f"{path}.tmp"
+                    with open(temp_path, "wb") as f:
+                        f.write(data)
+                    os.replace(temp_path, path)
+                except Exception as e:
+                    logger.error(f"Yedek dosyası yazılamadı ({path}): {e}")
+            for _ in range(received):
+                self._queue.task_done()
+
+backup_writer = BackupWriter()
+atexit.register(backup_writer.flush)
 
 class VectorDatabase:
     """Vektör veritabanı yönetimi için sınıf."""
     
-    def __init__(self, vector_dim: int = 1536):
+    def __init__(self, vector_dim: int = EMBEDDING_DIM):
         """Vektör veritabanını başlatır."""
-        self.character_index = IndexFlatL2(vector_dim)
-        self.location_index = IndexFlatL2(vector_dim)
-        self.event_index = IndexFlatL2(vector_dim)
+        # Normalize edilmiş vektörlerde iç çarpım = kosinüs benzerliği
+        self.character_index = _to_faiss_device(faiss.IndexFlatIP(vector_dim))
+        self.location_index = _to_faiss_device(faiss.IndexFlatIP(vector_dim))
+        self.event_index = _to_faiss_device(faiss.IndexFlatIP(vector_dim))
         
         self.characters: Dict[str, Character] = {}
         self.locations: Dict[str, Location] = {}
         self.events: Dict[str, Event] = {}
         
-        self.character_vectors: List[np.ndarray] = []
-        self.location_vectors: List[np.ndarray] = []
-        self.event_vectors: List[np.ndarray] = []
+        # Vektörler varlık türü başına tek bir bitişik float32 matriste tutulur (SoA);
+        # geçerli satır sayısı ilgili kimlik listesinin uzunluğudur
+        self.character_matrix = np.empty((0, vector_dim), dtype=np.float32)
+        self.location_matrix = np.empty((0, vector_dim), dtype=np.float32)
+        self.event_matrix = np.empty((0, vector_dim), dtype=np.float32)
+        
+        # Tekli aramalarda her seferinde yeni dizi ayırmamak için sorgu tamponu
+        self._query_buf = np.empty((1, vector_dim), dtype=np.float32)
+        
+        # FAISS indeks sırası -> varlık kimliği eşlemesi
+        self.character_ids: List[str] = []
+        self.location_ids: List[str] = []
+        self.event_ids: List[str] = []
+        
+        # İsim -> varlık dizinleri (aynı isimde ilk eklenen geçerlidir)
+        self.characters_by_name: Dict[str, Character] = {}
+        self.locations_by_name: Dict[str, Location] = {}
+        
+        # Varlık kimliği -> serileştirilmiş JSON baytları (yedeklerde tekrar kodlamamak için)
+        self._json_cache: Dict[str, bytes] = {}
+        
+    def _rebuild_name_indexes(self):
+        """İsim dizinlerini mevcut varlıklardan yeniden oluşturur."""
+        self.characters_by_name = {}
+        self.locations_by_name = {}
+        for character in self.characters.values():
+            self.characters_by_name.setdefault(character.name, character)
+        for location in self.locations.values():
+            self.locations_by_name.setdefault(location.name, location)
+        
+    @staticmethod
+    def _normalized(vectors: np.ndarray) -> np.ndarray:
+        """Vektörleri FAISS'e uygun float32 matrise çevirip L2 normalize eder (kopya üzerinde)."""
+        matrix = np.array(vectors, dtype=np.float32, ndmin=2, order='C')
+        faiss.normalize_L2(matrix)
+        return matrix
+        
+    @staticmethod
+    def _append_rows(matrix: np.ndarray, count: int, rows: np.ndarray) -> np.ndarray:
+        """Satırları matrisin sonuna yazar; kapasite yetmezse matrisi iki katına büyütür."""
+        needed = count + len(rows)
+        if needed > len(matrix):
+            grown = np.empty((max(needed, 2 * len(matrix), 16), matrix.shape[1]), dtype=np.float32)
+            grown[:count] = matrix[:count]
+            matrix = grown
+        matrix[count:needed] = rows
+        return matrix
+        
+    @property
+    def character_vectors(self) -> np.ndarray:
+        """Karakter vektörleri (normalize edilmiş), FAISS sırasıyla."""
+        return self.character_matrix[:len(self.character_ids)]
+        
+    @property
+    def location_vectors(self) -> np.ndarray:
+        """Konum vektörleri (normalize edilmiş), FAISS sırasıyla."""
+        return self.location_matrix[:len(self.location_ids)]
+        
+    @property
+    def event_vectors(self) -> np.ndarray:
+        """Olay vektörleri (normalize edilmiş), FAISS sırasıyla."""
+        return self.event_matrix[:len(self.event_ids)]
         
     def add_character(self, character: Character, vector: np.ndarray):
         """Karakteri vektör veritabanına ekler."""
+        rows = self._normalized(vector)
+        self.character_matrix = self._append_rows(self.character_matrix, len(self.character_ids), rows)
         self.characters[character.id] = character
-        self.character_vectors.append(vector)
-        self.character_index.add(np.array([vector]))
+        self.character_ids.append(character.id)
+        self.characters_by_name.setdefault(character.name, character)
+        self.character_index.add(rows)
         
     def add_location(self, location: Location, vector: np.ndarray):
         """Konumu vektör veritabanına ekler."""
+        rows = self._normalized(vector)
+        self.location_matrix = self._append_rows(self.location_matrix, len(self.location_ids), rows)
         self.locations[location.id] = location
-        self.location_vectors.append(vector)
-        self.location_index.add(np.array([vector]))
+        self.location_ids.append(location.id)
+        self.locations_by_name.setdefault(location.name, location)
+        self.location_index.add(rows)
         
     def add_event(self, event: Event, vector: np.ndarray):
         """Olayı vektör veritabanına ekler."""
+        rows = self._normalized(vector)
+        self.event_matrix = self._append_rows(self.event_matrix, len(self.event_ids), rows)
         self.events[event.id] = event
-        self.event_vectors.append(vector)
-        self.event_index.add(np.array([vector]))
+        self.event_ids.append(event.id)
+        self.event_index.add(rows)
+        
+    def bulk_add_characters(self, characters: List[Character], vectors: np.ndarray):
+        """Karakterleri tek bir FAISS çağrısıyla toplu olarak ekler."""
+        if not characters:
+            return
+        rows = self._normalized(vectors)
+        self.character_matrix = self._append_rows(self.character_matrix, len(self.character_ids), rows)
+        self.characters.update({c.id: c for c in characters})
+        self.character_ids.extend(c.id for c in characters)
+        for c in characters:
+            self.characters_by_name.setdefault(c.name, c)
+        self.character_index.add(rows)
+        
+    def bulk_add_locations(self, locations: List[Location], vectors: np.ndarray):
+        """Konumları tek bir FAISS çağrısıyla toplu olarak ekler."""
+        if not locations:
+            return
+        rows = self._normalized(vectors)
+        self.location_matrix = self._append_rows(self.location_matrix, len(self.location_ids), rows)
+        self.locations.update({l.id: l for l in locations})
+        self.location_ids.extend(l.id for l in locations)
+        for l in locations:
+            self.locations_by_name.setdefault(l.name, l)
+        self.location_index.add(rows)
+        
+    def bulk_add_events(self, events: List[Event], vectors: np.ndarray):
+        """Olayları tek bir FAISS çağrısıyla toplu olarak ekler."""
+        if not events:
+            return
+        rows = self._normalized(vectors)
+        self.event_matrix = self._append_rows(self.event_matrix, len(self.event_ids), rows)
+        self.events.update({e.id: e for e in events})
+        self.event_ids.extend(e.id for e in events)
+        self.event_index.add(rows)
+        
+    def _query_vector(self, vector: np.ndarray) -> np.ndarray:
+        """Tek sorgu vektörünü önceden ayrılmış tampona kopyalayıp normalize eder."""
+        np.copyto(self._query_buf, vector, casting='same_kind')
+        faiss.normalize_L2(self._query_buf)
+        return self._query_buf
         
     def search_similar_characters(self, vector: np.ndarray, k: int = 5) -> List[Character]:
         """Benzer karakterleri bulur."""
         if self.character_index.ntotal == 0:
             return []
             
-        distances, indices = self.character_index.search(np.array([vector]), k)
-        return [list(self.characters.values())[i] for i in indices[0] if i < len(self.characters)]
+        distances, indices = self.character_index.search(self._query_vector(vector), k)
+        return [self.characters[self.character_ids[i]] for i in indices[0] if 0 <= i < len(self.character_ids)]
         
     def search_similar_locations(self, vector: np.ndarray, k: int = 5) -> List[Location]:
         """Benzer konumları bulur."""
         if self.location_index.ntotal == 0:
             return []
             
-        distances, indices = self.location_index.search(np.array([vector]), k)
-        return [list(self.locations.values())[i] for i in indices[0] if i < len(self.locations)]
+        distances, indices = self.location_index.search(self._query_vector(vector), k)
+        return [self.locations[self.location_ids[i]] for i in indices[0] if 0 <= i < len(self.location_ids)]
         
-    def search_similar_events(self, vector: np.ndarray, k: int = 5) -> List[Event]:
-        """Benzer olayları bulur."""
-        if self.event_index.ntotal == 0:
+    def search_similar_events(self, vector: np.ndarray, k: int = 5,
+                              max_chapter: Optional[int] = None) -> List[Event]:
+        """Benzer olayları bulur.
+        
+        max_chapter verilirse yalnızca o bölüme kadar (dahil) olan olaylar arasından en yakın k olay
+        döndürülür; sonraki bölümlerin olayları sonucu etkilemesin diye arama gerektikçe genişletilir.
+        """
+        total = self.event_index.ntotal
+        if total == 0:
             return []
-            
-        distances, indices = self.event_index.search(np.array([vector]), k)
-        return [list(self.events.values())[i] for i in indices[0] if i < len(self.events)]
+        
+        query = self._query_vector(vector)
+        search_k = k
+        while True:
+            distances, indices = self.event_index.search(query, min(search_k, total))
+            events = [self.events[self.event_ids[i]] for i in indices[0] if 0 <= i < len(self.event_ids)]
+            if max_chapter is not None:
+                events = [event for event in events if event.chapter <= max_chapter]
+            if len(events) >= k or search_k >= total:
+                return events[:k]
+            search_k *= 2
+    
+    def _encoded_entities(self, ids: List[str], entities: Dict[str, Any]) -> bytes:
+        """Varlıkları JSON dizisi baytlarına çevirir; her varlık yalnızca ilk kayıtta serileştirilir.
+        
+        Varlıklar veritabanına eklendikten sonra değiştirilmediği için önbellek kimliğe göre tutulur.
+        """
+        parts = []
+        for entity_id in ids:
+            encoded = self._json_cache.get(entity_id)
+            if encoded is None:
+                encoded = self._json_cache[entity_id] = _dump_json(asdict(entities[entity_id]), indent=False)
+            parts.append(encoded)
+        return b"[" + b",".join(parts) + b"]"
     
     def save_to_file(self, filename: str = "vector_db_backup.json"):
         """Veritabanı durumunu diske kaydeder."""
         try:
-            character_data = [{
-                "id": char.id,
-                "name": char.name,
-                "description": char.description,
-                "traits": char.traits,
-                "background": char.background,
-                "relationships": char.relationships,
-                "story_arc": char.story_arc
-            } for char in self.characters.values()]
+            # Önceki kayıtlardan beri eklenmiş varlıklar dışında serileştirme yapılmaz
+            data = b"".join([
+                b'{"characters":', self._encoded_entities(self.character_ids, self.characters),
+                b',"locations":', self._encoded_entities(self.location_ids, self.locations),
+                b',"events":', self._encoded_entities(self.event_ids, self.events),
+                b"}"
+            ])
             
-            location_data = [{
-                "id": loc.id,
-                "name": loc.name,
-                "description": loc.description,
-                "importance": loc.importance,
-                "connected_locations": loc.connected_locations
-            } for loc in self.locations.values()]
+            # Disk yazımı arka planda yapılır
+            backup_writer.submit(filename, data)
+                
+            logger.info(f"Vektör veritabanı durumu {filename} dosyasına kaydedilmek üzere kuyruğa alındı.")
+        except Exception as e:
+            logger.error(f"Veritabanı kaydetme hatası: {e}")
+    
+    def save_binary(self, directory: str = "backup/vector_db"):
+        """FAISS indekslerini, vektör matrislerini (.npy) ve meta verileri (.json) ikili olarak kaydeder.
+        
+        Dosyalar önce geçici adlarla yazılır, ardından os.replace ile yerlerine taşınır; yazım yarıda
+        kesilirse önceki kayıt bozulmadan kalır.
+        """
+        try:
+            os.makedirs(directory, exist_ok=True)
+            stores = [
+                ("characters", self.character_index, self.character_vectors, self.character_ids, self.characters),
+                ("locations", self.location_index, self.location_vectors, self.location_ids, self.locations),
+                ("events", self.event_index, self.event_vectors, self.event_ids, self.events),
+            ]
+            written = []
+            for name, index, vectors, ids, entities in stores:
+                base = os.path.join(directory, name)
+                faiss.write_index(_to_faiss_cpu(index), f"{base}.faiss.tmp")
+                # np.save dosya adına .npy ekleyeceği için dosya nesnesi verilir
+                with open(f"{base}.npy.tmp", "wb") as f:
+                    np.save(f, vectors)
+                with open(f"{base}.json.tmp", "wb") as f:
+                    f.write(self._encoded_entities(ids, entities))
+                written.extend(f"{base}{ext}" for ext in (".faiss", ".npy", ".json"))
             
-            event_data = [{
-                "id": event.id,
-                "title": event.title,
-                "description": event.description,
-                "characters_involved": event.characters_involved,
-                "location_id": event.location_id,
-                "preceding_events": event.preceding_events,
-                "following_events": event.following_events,
-                "chapter": event.chapter
-            } for event in self.events.values()]
+            # Tüm dosyalar yazıldıktan sonra yerlerine taşınır
+            for path in written:
+                os.replace(f"{path}.tmp", path)
             
-            data = {
-                "characters": character_data,
-                "locations": location_data,
-                "events": event_data
-            }
+            logger.info(f"Vektör veritabanı ikili olarak {directory} dizinine kaydedildi.")
+        except Exception as e:
+            logger.error(f"Veritabanı ikili kaydetme hatası: {e}")
+    
+    @classmethod
+    def load_binary(cls, directory: str = "backup/vector_db") -> "VectorDatabase":
+        """save_binary ile kaydedilmiş veritabanını yükler; matrisler belleğe eşlenir (mmap).
+        
+        Betik bu yöntemi kendisi çağırmaz (kaldığı yerden devam etme desteği yoktur); kayıtları
+        yeniden embedding hesaplamadan incelemek veya başka araçlarda kullanmak için elle çağrılır.
+        """
+        db = cls()
+        stores = [("characters", Character), ("locations", Location), ("events", Event)]
+        for name, model in stores:
+            base = os.path.join(directory, name)
+            index = _to_faiss_device(faiss.read_index(f"{base}.faiss"))
+            matrix = np.load(f"{base}.npy", mmap_mode='r')
+            with open(f"{base}.json", "rb") as f:
+                entities = [model(**item) for item in _load_json(f.read())]
             
-            with open(filename, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-                
-            logger.info(f"Vektör veritabanı durumu {filename} dosyasına kaydedildi.")
+            kind = name[:-1]
+            setattr(db, f"{kind}_index", index)
+            setattr(db, f"{kind}_matrix", matrix)
+            setattr(db, f"{kind}_ids", [e.id for e in entities])
+            setattr(db, name, {e.id: e for e in entities})
+        db._rebuild_name_indexes()
+        
+        logger.info(f"Vektör veritabanı {directory} dizininden yüklendi.")
+        return db
+
+class EmbeddingCache:
+    """Embedding vektörlerini metnin SHA-256 özetine göre diskte önbelleğe alır."""
+    
+    def __init__(self, path: str, model: str):
+        """Önbelleği başlatır ve varsa diskteki kayıtları yükler."""
+        self.path = path
+        self.model = model
+        self._vectors: Dict[str, np.ndarray] = {}
+        self._dirty = False
+        self._load()
+    
+    @staticmethod
+    def _key(text: str) -> str:
+        """Metin için önbellek anahtarını üretir."""
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+    
+    def _load(self):
+        """Önbellek dosyasını okur; farklı bir modele aitse yok sayar."""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with np.load(self.path) as data:
+                if str(data['model']) != self.model:
+                    logger.info(f"Embedding önbelleği farklı bir modele ait ({data['model']}), yok sayılıyor.")
+                    return
+                for key, vector in zip(data['keys'], data['vectors']):
+                    self._vectors[str(key)] = vector
+            logger.info(f"Embedding önbelleğinden {len(self._vectors)} vektör yüklendi.")
         except Exception as e:
-            logger.error(f"Veritabanı kaydetme hatası: {e}")
+            logger.error(f"Embedding önbelleği okuma hatası: {e}")
+    
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """Metnin önbellekteki vektörünü döndürür, yoksa None."""
+        return self._vectors.get(self._key(text))
+    
+    def put(self, text: str, vector: np.ndarray):
+        """Metnin vektörünü önbelleğe ekler."""
+        self._vectors[self._key(text)] = vector
+        self._dirty = True
+    
+    def save(self):
+        """Yeni eklenen kayıt varsa önbelleği diske yazar."""
+        if not self._dirty:
+            return
+        # Bayrak anlık görüntüden önce sıfırlanır; yazım sırasında eklenen kayıtlar bir sonraki kayda kalır.
+        # Arka plandaki bir iş parçacığından çağrılabilmesi için sözlüğün kopyası üzerinden çalışılır.
+        self._dirty = False
+        items = list(self._vectors.items())
+        try:
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "wb") as f:
+                np.savez(
+                    f,
+                    model=np.array(self.model),
+                    keys=np.array([key for key, _ in items]),
+                    vectors=np.stack([vector for _, vector in items])
+                )
+            os.replace(temp_path, self.path)
+            logger.info(f"Embedding önbelleği {self.path} dosyasına kaydedildi ({len(items)} vektör).")
+        except Exception as e:
+            self._dirty = True
+            logger.error(f"Embedding önbelleği kaydetme hatası: {e}")
 
 class ConfigParser:
     """Tema yapılandırma dosyasını okur ve işler."""
@@ -295,27 +939,285 @@ class ConfigParser:
             logger.error(f"Yapılandırma dosyası okuma hatası: {e}")
             raise
 
+# JSON ayrıştırma yardımcı fonksiyonu
+def _close_json_brackets(fragment: str) -> str:
+    """Yarıda kesilmiş JSON parçasındaki açık dizgi ve parantezleri kapatır."""
+    closers = []
+    in_string = False
+    escaped = False
+    for ch in fragment:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == '\\':
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in '[{':
+            closers.append(']' if ch == '[' else '}')
+        elif ch in ']}' and closers:
+            closers.pop()
+    if in_string:
+        fragment += '"'
+    return fragment.rstrip().rstrip(',') + "".join(reversed(closers))
+
+def _bracket_span_end(text: str, start: int) -> int:
+    """start konumundaki '[' ile eşleşen kapanışın bir sonrasını döndürür; kapanmıyorsa -1."""
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == '\\':
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in '[{':
+            depth += 1
+        elif ch in ']}':
+            depth -= 1
+            if depth == 0:
+                return i + 1
+    return -1
+
+def _recover_json(text: str) -> List[Any]:
+    """Model yanıtındaki JSON dizisini yerelde kurtarmaya çalışır; başaramazsa JSONDecodeError fırlatır.
+    
+    Sırasıyla: (1) boşlukları kırp, (2) ``` kod bloğu işaretlerini kaldır, (3) yalnızca en üst
+    düzeydeki '[' konumlarından dengeli ilk diziyi ayrıştır (iç içe diziler aday değildir),
+    (4) yarıda kesilmiş yanıtta son tam öğeye kadar geri gidip açık parantezleri kapat.
+    """
+    # S1 + S2: kırp ve kod bloğu işaretlerini kaldır
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else text[3:]
+    if text.endswith("```"):
+        text = text[:-3].rstrip()
+    
+    # Yanıt zaten temiz bir JSON dizisiyse tek seferde ayrıştır
+    if text.startswith('['):
+        try:
+            data = _load_json(text)
+            if isinstance(data, list):
+                return data
+        except json.JSONDecodeError:
+            pass
+    
+    # S3: önündeki açıklamada köşeli parantez olabilir; üst düzey '[' konumlarını dene.
+    # Bir adayın içindeki '[' konumları atlanır; aksi halde yarıda kesilmiş bir yanıtta
+    # ilk iç içe dizi (ör. bir karakterin "traits" listesi) sonuç olarak döndürülürdü.
+    decoder = json.JSONDecoder()
+    start = text.find('[')
+    if start == -1:
+        raise json.JSONDecodeError("JSON dizisi bulunamadı", text, 0)
+    repair_start = start
+    while start != -1:
+        span_end = _bracket_span_end(text, start)
+        if span_end == -1:
+            # Kapanmayan üst düzey dizi: yanıt yarıda kesilmiş, doğrudan S4'e geç
+            repair_start = start
+            break
+        try:
+            data, _ = decoder.raw_decode(text, start)
+            if isinstance(data, list):
+                return data
+        except json.JSONDecodeError:
+            pass
+        start = text.find('[', span_end)
+    
+    # S4: yanıt yarıda kesilmiş; son tam nesne/diziye kadar kısaltıp parantezleri kapat
+    fragment = text[repair_start:]
+    end = len(fragment)
+    for _ in range(50):
+        try:
+            data = _load_json(_close_json_brackets(fragment[:end]))
+            if isinstance(data, list):
+                return data
+        except json.JSONDecodeError:
+            pass
+        end = max(fragment.rfind('}', 0, end), fragment.rfind(']', 0, end)) + 1
+        if end <= 0:
+            break
+    raise json.JSONDecodeError("JSON dizisi kurtarılamadı", text, repair_start)
+
+def _require_objects(data: List[Any], text: str) -> List[Dict[str, Any]]:
+    """Dizi boşsa veya öğeleri JSON nesnesi değilse JSONDecodeError fırlatır (yeniden deneme tetiklenir)."""
+    if not data or not all(isinstance(item, dict) for item in data):
+        raise json.JSONDecodeError("JSON dizisi boş veya nesnelerden oluşmuyor", text, 0)
+    return data
+
+def _parse_object_array(text: str) -> List[Dict[str, Any]]:
+    """Model yanıtından JSON nesneleri dizisini kurtarır; başaramazsa JSONDecodeError fırlatır."""
+    return _require_objects(_recover_json(text), text)
+
+def _check_chapter_content(text: str) -> None:
+    """Bölüm metni çok kısa veya boşsa (muhtemelen hatalı yanıt) ValueError fırlatır."""
+    if not text or len(text) < 500:
+        raise ValueError("Üretilen içerik çok kısa veya boş")
+
+# Bölüm isteminin bölüme özgü kısmı; modül yüklenirken bir kez derlenir
+CHAPTER_PROMPT_TEMPLATE = string.Template("""
+Yukarıdaki hikaye rehberine ve yazım kurallarına dayanarak, aşağıdaki kitap bölümünü oluştur:
+
+Bölüm Numarası: $number
+Bölüm Başlığı: $title
+Bölüm Özeti: $summary
+
+Bölümdeki Karakterler: $characters
+
+Bölümdeki Konumlar: $locations
+
+Ana Olaylar:
+$events
+
+Önceki Bölümler Bağlamı:
+$previous_chapters
+
+İlgili Geçmiş Olaylar:
+$related_events
+""")
+
 class StoryGenerator:
     """Ana hikaye oluşturma sınıfı."""
     
-    def __init__(self, config: StoryConfig, api_key: str):
+    def __init__(self, config: StoryConfig, api_key: str, use_response_cache: bool = True):
         """Hikaye oluşturucuyu başlatır."""
         self.config = config
-        self.gemini_client = GeminiClient(api_key)
+        self.gemini_client = GeminiClient(api_key, "backup/llm_cache" if use_response_cache else None)
         self.vector_db = VectorDatabase()
         self.chapters: List[Chapter] = []
+        # Taslak dosyasına zaten yazılmış bölüm sayısı (save_progress yalnızca yenileri ekler)
+        self._saved_chapter_count = 0
+        # Vektör veritabanı ikili yedeği bir iş parçacığında yazılırken eşzamanlı eklemeleri engeller
+        self._db_lock = asyncio.Lock()
         
         # Çalışma dizinlerini oluştur
         os.makedirs("output", exist_ok=True)
         os.makedirs("backup", exist_ok=True)
         
+        self.embedding_cache = EmbeddingCache("backup/embeddings.npz", self.gemini_client.embedding_model)
+        # Metne bağlı olması gerekmeyen yer tutucu vektörler için örneğe özel üreteç; doğrudan float32 üretir
+        self._rng = np.random.default_rng()
+        
+        # Ana olay örgüsü özeti (bağlam önbelleğine yüklenir)
+        self.plot_summary = ""
+        
+        # Prompt'larda kullanılan karakter/konum listeleri (evren değişince yeniden oluşturulur)
+        self._character_ctx = ""
+        self._location_ctx = ""
+        self._universe_ctx_key: Optional[Tuple[int, int]] = None
+        
+        # Varlık kimliği -> (kısa liste satırı, ayrıntılı rehber satırı); her varlık için bir kez kesilir
+        self._character_snippets: Dict[str, Tuple[str, str]] = {}
+        self._location_snippets: Dict[str, Tuple[str, str]] = {}
+        
+        # Bölüm istemlerinin sabit ön eki (tür, özet, karakter/konum ayrıntıları, yazım kuralları)
+        self._story_bible = ""
+        self._story_bible_key: Optional[Tuple[int, int]] = None
+        
+    def _refresh_snippets(self) -> None:
+        """Henüz kısaltılmamış karakter/konum metinlerini bir kez keser ve saklar."""
+        for char_id, char in self.vector_db.characters.items():
+            if char_id not in self._character_snippets:
+                self._character_snippets[char_id] = (
+                    f"- {char.name}: {char.description[:100]}...",
+                    f"- {char.name}: {char.description}\n  Geçmiş: {char.background[:200]}..."
+                )
+        for loc_id, loc in self.vector_db.locations.items():
+            if loc_id not in self._location_snippets:
+                self._location_snippets[loc_id] = (
+                    f"- {loc.name}: {loc.description[:100]}...",
+                    f"- {loc.name}: {loc.description[:200]}..."
+                )
+        
+    def _universe_context(self) -> Tuple[str, str]:
+        """Karakter ve konum listesi metinlerini döndürür; yalnızca yeni varlık eklendiyse yeniden oluşturur."""
+        key = (len(self.vector_db.character_ids), len(self.vector_db.location_ids))
+        if key != self._universe_ctx_key:
+            self._refresh_snippets()
+            self._character_ctx = "\n".join([short for short, _ in self._character_snippets.values()])
+            self._location_ctx = "\n".join([short for short, _ in self._location_snippets.values()])
+            self._universe_ctx_key = key
+        return self._character_ctx, self._location_ctx
+        
+    @staticmethod
+    def _fallback_vectors(texts: List[str]) -> np.ndarray:
+        """Embedding alınamadığında metne bağlı, çalıştırmalar arasında tekrarlanabilir sözde vektörler üretir."""
+        vectors = np.empty((len(texts), EMBEDDING_DIM), dtype=np.float32)
+        for i, text in enumerate(texts):
+            # hash() PYTHONHASHSEED ile her çalıştırmada değişir; sabit 64 bit tohum kullan
+            seed = int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+            vectors[i] = np.random.default_rng(seed).random(EMBEDDING_DIM, dtype=np.float32)
+        return vectors
+        
+    def _get_story_bible(self) -> str:
+        """Tüm bölüm istemlerinde aynı kalan hikaye rehberini döndürür.
+        
+        Metin bir kez oluşturulup aynen yeniden kullanılır; böylece istem ön eki çağrılar arasında
+        bayt bayt aynı kalır ve hem örtük hem açık önbellekleme ile eşleşir.
+        """
+        key = (len(self.vector_db.character_ids), len(self.vector_db.location_ids))
+        if key != self._story_bible_key:
+            self._refresh_snippets()
+            character_details = "\n".join([detail for _, detail in self._character_snippets.values()])
+            location_details = "\n".join([detail for _, detail in self._location_snippets.values()])
+            self._story_bible = "\n\n".join([
+                f"Tür: {self.config.genre}\nTema: {self.config.theme}\nTon: {self.config.tone}",
+                f"Hikaye Özeti:\n{self.plot_summary}",
+                f"Karakterler:\n{character_details}",
+                f"Konumlar:\n{location_details}",
+                "Yazım Kuralları:\n"
+                "- Akıcı ve sürükleyici anlatım\n"
+                "- Karakter gelişimini ve motivasyonlarını yansıtan diyaloglar\n"
+                "- Ayrıntılı mekan tasvirleri\n"
+                "- Olayların tutarlı bir şekilde ilerlemesi\n"
+                "- Belirtilen olayları içermeli ama detayları zenginleştirmeli\n"
+                "- Önceki bölümlere ve geçmiş olaylara doğal referanslar\n"
+                "- Her bölüm tamamen Türkçe, yaklaşık 2000-3000 kelime uzunluğunda ve Markdown formatında olmalıdır",
+            ])
+            self._story_bible_key = key
+        return self._story_bible
+        
+    async def generate_vectors(self, texts: List[str]) -> np.ndarray:
+        """Metin listesinden tek bir toplu embedding çağrısıyla vektör matrisi oluşturur."""
+        vectors = np.empty((len(texts), EMBEDDING_DIM), dtype=np.float32)
+        
+        # Önbellekte olanları doğrudan al, yalnızca eksikleri API'ye gönder
+        misses = []
+        for i, text in enumerate(texts):
+            cached = self.embedding_cache.get(text)
+            if cached is None:
+                misses.append(i)
+            else:
+                vectors[i] = cached
+        
+        if not misses:
+            return vectors
+        
+        try:
+            fresh = await self.gemini_client.embed_batch([texts[i] for i in misses])
+        except Exception as e:
+            logger.error(f"Embedding oluşturma hatası: {e}")
+            logger.warning("Rastgele vektörlerle devam ediliyor...")
+            vectors[misses] = self._fallback_vectors([texts[i] for i in misses])
+            return vectors
+        
+        vectors[misses] = fresh
+        for i, vector in zip(misses, fresh):
+            self.embedding_cache.put(texts[i], vector)
+        return vectors
+    
     async def generate_vector(self, text: str) -> np.ndarray:
         """Metinden vektör temsili oluşturur."""
-        # Basit bir hash tabanlı vektör oluşturma
-        # Gerçek uygulamada, embedding modeli kullanılmalıdır
-        hash_value = hash(text)
-        random.seed(hash_value)
-        return np.array([random.random() for _ in range(1536)])
+        vectors = await self.generate_vectors([text])
+        return vectors[0]
         
     async def create_universe(self) -> None:
         """Hikaye evrenini başlatır."""
@@ -342,6 +1244,7 @@ class StoryGenerator:
             
             logger.info("Ana olay örgüsü oluşturuluyor...")
             plot_summary = await self.gemini_client.generate_content(plot_prompt)
+            self.plot_summary = plot_summary
             logger.info("Ana olay örgüsü oluşturuldu.")
             
             # Ana karakterleri oluştur
@@ -366,10 +1269,27 @@ class StoryGenerator:
             Lütfen karakterleri sadece JSON formatında, başka hiçbir açıklama eklemeden döndür.
             """
             
-            logger.info("Karakterler oluşturuluyor...")
+            # Konum isteğini hazırla
+            locations_prompt = f"""
+            Az önce oluşturulan şu ana hikaye özetine dayalı olarak:
+            {plot_summary}
             
-            # JSON hatasını önlemek için daha net bir formatta karakter oluştur
-            characters_json = await self.gemini_client.generate_content(characters_prompt)
+            Bu hikaye için 10-15 önemli konum oluştur. Her konum için şunları belirt:
+            - İsim
+            - Detaylı açıklama
+            - Hikayedeki önemi
+            - Bağlantılı diğer konumlar
+            
+            Konumlar zengin, detaylı ve hikaye türüne ({self.config.genre}) uygun olmalıdır.
+            Lütfen konumları JSON formatında döndür.
+            """
+            
+            # Karakter ve konum istekleri birbirinden bağımsız, eşzamanlı gönder
+            logger.info("Karakterler ve konumlar oluşturuluyor...")
+            characters_json, locations_json = await asyncio.gather(
+                self.gemini_client.generate_content(characters_prompt, validate=_parse_object_array),
+                self.gemini_client.generate_content(locations_prompt, validate=_parse_object_array)
+            )
             
             # Karakterleri işle ve veritabanına ekle
             retry_count = 0
@@ -378,22 +1298,14 @@ class StoryGenerator:
             
             while retry_count < max_retries and not characters_processed:
                 try:
-                    # JSON'ı temizle - sadece ilk [ ve son ] arasını al
-                    cleaned_json = characters_json
-                    start_idx = characters_json.find('[')
-                    end_idx = characters_json.rfind(']')
-                    
-                    if start_idx != -1 and end_idx != -1 and start_idx < end_idx:
-                        cleaned_json = characters_json[start_idx:end_idx+1]
-                    
-                    # JSON ayrıştırmayı dene
-                    characters_data = json.loads(cleaned_json)
+                    # İlk JSON dizisini ayrıştır (sondaki açıklamalar yok sayılır)
+                    characters_data = _parse_object_array(characters_json)
                     character_count = len(characters_data)
                     logger.info(f"{character_count} karakter oluşturuldu.")
                     
                     # Varsayılan değerlerle karakterleri işle
-                    for char_data in tqdm(characters_data, desc="Karakterler işleniyor", unit="karakter"):
-                        character = Character(
+                    characters = [
+                        Character(
                             id=str(uuid.uuid4()),
                             name=char_data.get('name', 'İsimsiz Karakter'),
                             description=char_data.get('description', 'Açıklama yok'),
@@ -402,9 +1314,13 @@ class StoryGenerator:
                             relationships=char_data.get('relationships', {}),
                             story_arc=char_data.get('story_arc', '')
                         )
-                        vector = await self.generate_vector(f"{character.name} {character.description} {character.background}")
-                        character.vector = vector
-                        self.vector_db.add_character(character, vector)
+                        for char_data in characters_data
+                    ]
+                    # Tüm karakterler için tek bir toplu embedding çağrısı
+                    vectors = await self.generate_vectors([
+                        f"{c.name} {c.description} {c.background}" for c in characters
+                    ])
+                    self.vector_db.bulk_add_characters(characters, vectors)
                     
                     characters_processed = True
                     
@@ -441,92 +1357,43 @@ class StoryGenerator:
                         """
                         
                         logger.info("Karakter JSON'ı düzeltiliyor...")
-                        characters_json = await self.gemini_client.generate_content(fix_prompt)
+                        characters_json = await self.gemini_client.generate_content(
+                            fix_prompt, service_tier="flex", refresh_cache=retry_count > 1, validate=_parse_object_array
+                        )
                     else:
                         # Son çare olarak basit karakter oluştur
                         logger.warning("Maksimum yeniden deneme sayısına ulaşıldı. Temel karakterler oluşturuluyor.")
-                        
-                        default_characters = [
-                            {
-                                "name": "Ana Kahraman",
-                                "description": "Hikayenin ana kahramanı, cesur ve kararlı bir karakter.",
-                                "traits": ["Cesur", "Kararlı", "Dürüst"],
-                                "background": "Sıradan bir hayattan maceraya atılan genç.",
-                                "relationships": {},
-                                "story_arc": "Kahramanın yolculuğu"
-                            },
-                            {
-                                "name": "Akıl Hocası",
-                                "description": "Kahramana yol gösteren bilge karakter.",
-                                "traits": ["Bilge", "Gizemli", "Yardımsever"],
-                                "background": "Uzun yıllar boyunca bilgi biriktirmiş yaşlı bir rehber.",
-                                "relationships": {"Ana Kahraman": "Rehber ve öğretmen"},
-                                "story_arc": "Kahramana rehberlik etme"
-                            },
-                            {
-                                "name": "Rakip",
-                                "description": "Kahramanın yoluna çıkan güçlü rakip.",
-                                "traits": ["Hırslı", "Zeki", "Rekabetçi"],
-                                "background": "Kendi hedefleri için mücadele eden güçlü karakter.",
-                                "relationships": {"Ana Kahraman": "Rakip"},
-                                "story_arc": "Rekabet ve çatışma"
-                            }
-                        ]
-                        
-                        for char_data in default_characters:
-                            character = Character(
-                                id=str(uuid.uuid4()),
-                                name=char_data["name"],
-                                description=char_data["description"],
-                                traits=char_data["traits"],
-                                background=char_data["background"],
-                                relationships=char_data["relationships"],
-                                story_arc=char_data["story_arc"]
-                            )
-                            vector = await self.generate_vector(f"{character.name} {character.description} {character.background}")
-                            character.vector = vector
-                            self.vector_db.add_character(character, vector)
+                        characters = _default_characters()
+                        vectors = await self.generate_vectors([
+                            f"{c.name} {c.description} {c.background}" for c in characters
+                        ])
+                        self.vector_db.bulk_add_characters(characters, vectors)
                         
                         characters_processed = True
             
-            # Konumları oluştur
-            locations_prompt = f"""
-            Az önce oluşturulan şu ana hikaye özetine dayalı olarak:
-            {plot_summary}
-            
-            Bu hikaye için 10-15 önemli konum oluştur. Her konum için şunları belirt:
-            - İsim
-            - Detaylı açıklama
-            - Hikayedeki önemi
-            - Bağlantılı diğer konumlar
-            
-            Konumlar zengin, detaylı ve hikaye türüne ({self.config.genre}) uygun olmalıdır.
-            Lütfen konumları JSON formatında döndür.
-            """
-            
-            logger.info("Konumlar oluşturuluyor...")
-            locations_json = await self.gemini_client.generate_content(locations_prompt)
-            
             # Konumları işle ve veritabanına ekle
             retry_count = 0
             
             while retry_count < max_retries:
                 try:
-                    locations_data = json.loads(locations_json)
+                    locations_data = _parse_object_array(locations_json)
                     location_count = len(locations_data)
                     logger.info(f"{location_count} konum oluşturuldu.")
                     
-                    for loc_data in tqdm(locations_data, desc="Konumlar işleniyor", unit="konum"):
-                        location = Location(
+                    locations = [
+                        Location(
                             id=str(uuid.uuid4()),
                             name=loc_data.get('name', ''),
                             description=loc_data.get('description', ''),
                             importance=loc_data.get('importance', ''),
                             connected_locations=loc_data.get('connected_locations', [])
                         )
-                        vector = await self.generate_vector(f"{location.name} {location.description}")
-                        location.vector = vector
-                        self.vector_db.add_location(location, vector)
+                        for loc_data in locations_data
+                    ]
+                    vectors = await self.generate_vectors([
+                        f"{l.name} {l.description}" for l in locations
+                    ])
+                    self.vector_db.bulk_add_locations(locations, vectors)
                     
                     break  # JSON başarıyla ayrıştırıldı, döngüden çık
                     
@@ -549,30 +1416,24 @@ class StoryGenerator:
                         
                         Lütfen SADECE JSON formatını döndür, başka açıklama ekleme.
                         """
-                        locations_json = await self.gemini_client.generate_content(fix_prompt)
+                        locations_json = await self.gemini_client.generate_content(
+                            fix_prompt, service_tier="flex", refresh_cache=retry_count > 1, validate=_parse_object_array
+                        )
                     else:
                         logger.error("Maksimum yeniden deneme sayısına ulaşıldı. Basit konumlarla devam ediliyor...")
                         # Birkaç varsayılan konum oluştur
-                        default_locations = [
-                            {"name": "Ana Şehir", "description": "Hikayenin ana mekanı olan büyük şehir", "importance": "Merkezi", "connected_locations": []},
-                            {"name": "Orman", "description": "Şehrin dışındaki geniş ve gizemli orman", "importance": "Önemli", "connected_locations": []},
-                            {"name": "Dağlar", "description": "Ufukta yükselen heybetli dağlar", "importance": "Arka plan", "connected_locations": []}
-                        ]
-                        
-                        for loc_data in default_locations:
-                            location = Location(
-                                id=str(uuid.uuid4()),
-                                name=loc_data.get('name', ''),
-                                description=loc_data.get('description', ''),
-                                importance=loc_data.get('importance', ''),
-                                connected_locations=loc_data.get('connected_locations', [])
-                            )
-                            vector = await self.generate_vector(f"{location.name} {location.description}")
-                            location.vector = vector
-                            self.vector_db.add_location(location, vector)
+                        locations = _default_locations()
+                        vectors = await self.generate_vectors([
+                            f"{l.name} {l.description}" for l in locations
+                        ])
+                        self.vector_db.bulk_add_locations(locations, vectors)
             
-            # Veritabanını diske kaydet
-            self.vector_db.save_to_file("backup/universe_data.json")            
+            # Veritabanını ve embedding önbelleğini diske kaydet
+            self.vector_db.save_to_file("backup/universe_data.json")
+            await asyncio.gather(
+                asyncio.to_thread(self.vector_db.save_binary),
+                asyncio.to_thread(self.embedding_cache.save)
+            )
             logger.info("Hikaye evreni başarıyla oluşturuldu.")
             
         except Exception as e:
@@ -586,84 +1447,35 @@ class StoryGenerator:
         logger.warning("Varsayılan hikaye evreni oluşturuluyor...")
         
         # Basit karakterler ekle
-        default_characters = [
-            {
-                "name": "Ana Kahraman",
-                "description": "Hikayenin ana kahramanı, cesur ve kararlı bir karakter.",
-                "traits": ["Cesur", "Kararlı", "Dürüst"],
-                "background": "Sıradan bir hayattan maceraya atılan genç.",
-                "relationships": {},
-                "story_arc": "Kahramanın yolculuğu"
-            },
-            {
-                "name": "Akıl Hocası",
-                "description": "Kahramana yol gösteren bilge karakter.",
-                "traits": ["Bilge", "Gizemli", "Yardımsever"],
-                "background": "Uzun yıllar boyunca bilgi biriktirmiş yaşlı bir rehber.",
-                "relationships": {"Ana Kahraman": "Rehber ve öğretmen"},
-                "story_arc": "Kahramana rehberlik etme"
-            },
-            {
-                "name": "Rakip",
-                "description": "Kahramanın yoluna çıkan güçlü rakip.",
-                "traits": ["Hırslı", "Zeki", "Rekabetçi"],
-                "background": "Kendi hedefleri için mücadele eden güçlü karakter.",
-                "relationships": {"Ana Kahraman": "Rakip"},
-                "story_arc": "Rekabet ve çatışma"
-            }
-        ]
-        
-        # Vektörleri senkron olarak oluştur
-        for char_data in default_characters:
-            character = Character(
-                id=str(uuid.uuid4()),
-                name=char_data["name"],
-                description=char_data["description"],
-                traits=char_data["traits"],
-                background=char_data["background"],
-                relationships=char_data["relationships"],
-                story_arc=char_data["story_arc"]
-            )
-            # Senkron olarak vektör oluştur
-            vector = np.random.rand(1536)
-            character.vector = vector
-            self.vector_db.add_character(character, vector)
+        characters = _default_characters()
+        # Tüm vektörleri tek çağrıda senkron olarak oluştur ve toplu ekle
+        vectors = self._rng.random((len(characters), EMBEDDING_DIM), dtype=np.float32)
+        self.vector_db.bulk_add_characters(characters, vectors)
         
         # Basit konumlar ekle
-        default_locations = [
-            {"name": "Ana Şehir", "description": "Hikayenin ana mekanı olan büyük şehir", "importance": "Merkezi", "connected_locations": []},
-            {"name": "Orman", "description": "Şehrin dışındaki geniş ve gizemli orman", "importance": "Önemli", "connected_locations": []},
-            {"name": "Dağlar", "description": "Ufukta yükselen heybetli dağlar", "importance": "Arka plan", "connected_locations": []}
-        ]
-        
-        for loc_data in default_locations:
-            location = Location(
-                id=str(uuid.uuid4()),
-                name=loc_data["name"],
-                description=loc_data["description"],
-                importance=loc_data["importance"],
-                connected_locations=loc_data["connected_locations"]
-            )
-            # Senkron olarak vektör oluştur
-            vector = np.random.rand(1536)
-            location.vector = vector
-            self.vector_db.add_location(location, vector)
+        locations = _default_locations()
+        vectors = self._rng.random((len(locations), EMBEDDING_DIM), dtype=np.float32)
+        self.vector_db.bulk_add_locations(locations, vectors)
         
         logger.info("Varsayılan hikaye evreni oluşturuldu.")
         
+    async def _create_story_context_cache(self) -> bool:
+        """Hikaye rehberini (özet, karakterler, konumlar, yazım kuralları) Gemini bağlam önbelleğine yükler."""
+        if not self.plot_summary:
+            return False
+        return await self.gemini_client.create_context_cache([self._get_story_bible()])
+        
     async def generate_story_outline(self) -> List[Dict[str, Any]]:
         """Hikaye taslağını oluşturur."""
         logger.info("Hikaye taslağı oluşturuluyor...")
         
-        character_list = "\n".join([
-            f"- {char.name}: {char.description[:100]}..." 
-            for char in self.vector_db.characters.values()
-        ])
-        
-        location_list = "\n".join([
-            f"- {loc.name}: {loc.description[:100]}..." 
-            for loc in self.vector_db.locations.values()
-        ])
+        # Bağlam önbelleği varsa karakter/konum listeleri tekrar gönderilmez
+        use_context_cache = self.gemini_client.cached_model is not None
+        if use_context_cache:
+            universe_block = "Karakterler ve konumlar için önbellekteki hikaye bağlamını kullan."
+        else:
+            character_list, location_list = self._universe_context()
+            universe_block = f"Karakterler:\n{character_list}\n\nKonumlar:\n{location_list}"
         
         outline_prompt = f"""
         Aşağıdaki bilgilere dayanarak, {self.config.chapter_count} bölümlük bir kitap için ayrıntılı bir taslak oluştur:
@@ -673,11 +1485,7 @@ class StoryGenerator:
         Ana Olay Örgüsü: {self.config.main_plot}
         Ton: {self.config.tone}
         
-        Karakterler:
-        {character_list}
-        
-        Konumlar:
-        {location_list}
+        {universe_block}
         
         Her bölüm için şunları içeren bir taslak oluştur:
         - Bölüm numarası
@@ -691,22 +1499,18 @@ class StoryGenerator:
         Her bölümü ayrı bir nesne olarak içeren geçerli bir JSON dizisi olarak döndür.
         """
         
-        outline_json = await self.gemini_client.generate_content(outline_prompt, max_tokens=8192)
+        outline_json = await self.gemini_client.generate_content(
+            outline_prompt, max_tokens=8192, use_context_cache=use_context_cache, service_tier="flex",
+            validate=_parse_object_array
+        )
         
         retry_count = 0
         max_retries = 3
         
         while retry_count < max_retries:
             try:
-                # JSON'ı temizle - sadece ilk ve son köşeli parantez arasını al
-                cleaned_json = outline_json
-                start_idx = outline_json.find('[')
-                end_idx = outline_json.rfind(']')
-                
-                if start_idx != -1 and end_idx != -1 and start_idx < end_idx:
-                    cleaned_json = outline_json[start_idx:end_idx+1]
-                
-                outline_data = json.loads(cleaned_json)
+                # Yanıttaki JSON'ı önce yerelde kurtarmayı dene; ancak başarısız olursa model düzeltir
+                outline_data = _parse_object_array(outline_json)
                 
                 # Bölüm sayısını ayarla
                 target_chapter_count = self.config.chapter_count
@@ -739,8 +1543,7 @@ class StoryGenerator:
                     chapter["number"] = i + 1
                 
                 # Outline'ı kaydet
-                with open("backup/story_outline.json", "w", encoding="utf-8") as f:
-                    json.dump(outline_data, f, ensure_ascii=False, indent=2)
+                backup_writer.submit("backup/story_outline.json", _dump_json(outline_data))
                 
                 logger.info(f"Hikaye taslağı oluşturuldu: {len(outline_data)} bölüm")
                 return outline_data
@@ -767,7 +1570,10 @@ class StoryGenerator:
                     Lütfen SADECE JSON dizisini döndür, ekstra metin ekleme. Tam olarak {self.config.chapter_count} bölüm içermeli.
                     """
                     
-                    outline_json = await self.gemini_client.generate_content(fix_prompt, max_tokens=8192)
+                    outline_json = await self.gemini_client.generate_content(
+                        fix_prompt, max_tokens=8192, service_tier="flex", refresh_cache=retry_count > 1,
+                        validate=_parse_object_array
+                    )
                 else:
                     logger.error("Maksimum yeniden deneme sayısına ulaşıldı. Varsayılan taslak oluşturuluyor...")
                     # Basit bir taslak oluştur
@@ -789,111 +1595,87 @@ class StoryGenerator:
                         })
                     
                     # Outline'ı kaydet
-                    with open("backup/story_outline_default.json", "w", encoding="utf-8") as f:
-                        json.dump(outline_data, f, ensure_ascii=False, indent=2)
+                    backup_writer.submit("backup/story_outline_default.json", _dump_json(outline_data))
                         
                     return outline_data
 
-    async def generate_chapter(self, chapter_outline: Dict[str, Any]) -> Chapter:
-        """Belirli bir bölüm için içerik oluşturur."""
+    async def generate_chapter(self, chapter_outline: Dict[str, Any],
+                               previous_outlines: Optional[List[Dict[str, Any]]] = None,
+                               context_cutoff: Optional[int] = None) -> Chapter:
+        """Belirli bir bölüm için içerik oluşturur.
+        
+        previous_outlines verilirse önceki bölümler bağlamı bu taslak girdilerinden kurulur (başlık ve
+        özet üretimden önce bilindiği için hemen önceki bölümler kullanılabilir). context_cutoff
+        verilirse üretilmiş çıktıdan gelen ilgili olaylar yalnızca o bölüme kadar (dahil) olanlardan
+        seçilir; aynı anda üretilen bölümlerin istemi böylece tamamlanma sırasından bağımsız kalır.
+        """
         chapter_num = chapter_outline.get('number', 0)
+        if context_cutoff is None:
+            context_cutoff = chapter_num - 1
         logger.info(f"Bölüm {chapter_num} oluşturuluyor...")
         
-        # Karakterleri topla
+        # Karakterleri topla (ayrıntıları hikaye rehberinde yer alır)
         chapter_characters = chapter_outline.get('characters', [])
-        character_details = []
-        
-        for char_name in chapter_characters:
-            # Karakter ismini veritabanında ara
-            matching_chars = [c for c in self.vector_db.characters.values() if c.name == char_name]
-            if matching_chars:
-                char = matching_chars[0]
-                character_details.append(f"- {char.name}: {char.description}\n  Geçmiş: {char.background[:200]}...")
         
         # Karakterler yoksa veya bulunamadıysa, var olan karakterlerden rastgele ekle
-        if not character_details and self.vector_db.characters:
+        if not any(name in self.vector_db.characters_by_name for name in chapter_characters) and self.vector_db.characters:
             chars = list(self.vector_db.characters.values())
             selected_chars = random.sample(chars, min(3, len(chars)))
             for char in selected_chars:
-                character_details.append(f"- {char.name}: {char.description}\n  Geçmiş: {char.background[:200]}...")
                 chapter_characters.append(char.name)
         
-        # Konumları topla
+        # Konumları topla (ayrıntıları hikaye rehberinde yer alır)
         chapter_locations = chapter_outline.get('locations', [])
-        location_details = []
-        
-        for loc_name in chapter_locations:
-            # Konum ismini veritabanında ara
-            matching_locs = [l for l in self.vector_db.locations.values() if l.name == loc_name]
-            if matching_locs:
-                loc = matching_locs[0]
-                location_details.append(f"- {loc.name}: {loc.description[:200]}...")
         
         # Konumlar yoksa veya bulunamadıysa, var olan konumlardan rastgele ekle
-        if not location_details and self.vector_db.locations:
+        if not any(name in self.vector_db.locations_by_name for name in chapter_locations) and self.vector_db.locations:
             locs = list(self.vector_db.locations.values())
             selected_locs = random.sample(locs, min(2, len(locs)))
             for loc in selected_locs:
-                location_details.append(f"- {loc.name}: {loc.description[:200]}...")
                 chapter_locations.append(loc.name)
         
         # Önceki bölümlerin bağlamını al
         previous_chapters_context = ""
-        if chapter_num > 1 and self.chapters:
-            prev_chapters = [ch for ch in self.chapters if ch.number < chapter_num]
-            if prev_chapters:
-                last_3_chapters = sorted(prev_chapters, key=lambda x: x.number, reverse=True)[:3]
-                for prev_ch in reversed(last_3_chapters):
-                    previous_chapters_context += f"\nBölüm {prev_ch.number} - {prev_ch.title}: {prev_ch.summary}\n"
-        
-        # Karakterleri seçili benzer olaylara bağlama
+        if previous_outlines is None:
+            # self.chapters taslak sırasıyla (numaraya göre artan) doldurulur; önceki bölümler
+            # listenin bir ön ekidir, sondan geriye yürümek sıralamaya gerek bırakmaz
+            end = len(self.chapters)
+            while end and self.chapters[end - 1].number >= chapter_num:
+                end -= 1
+            previous_outlines = [
+                {"number": ch.number, "title": ch.title, "summary": ch.summary}
+                for ch in self.chapters[max(0, end - 3):end]
+            ]
+        for prev in previous_outlines[-3:]:
+            previous_chapters_context += f"\nBölüm {prev.get('number')} - {prev.get('title')}: {prev.get('summary')}\n"
+        
+        # Bölüm özeti ve karakterlerine anlamca en yakın geçmiş olayları FAISS ile bul
         related_events = []
-        for character_name in chapter_characters:
-            if self.vector_db.events:
-                events_with_character = [
-                    e for e in self.vector_db.events.values() 
-                    if character_name in e.characters_involved
-                ]
-                if events_with_character:
-                    # En son 3 olayı al
-                    sorted_events = sorted(events_with_character, key=lambda x: x.chapter, reverse=True)[:3]
-                    for event in sorted_events:
-                        related_events.append(f"- {event.title}: {event.description}")
-        
-        related_events_str = "\n".join(related_events[:5])  # En fazla 5 ilgili olay
-        
-        chapter_prompt = f"""
-        Aşağıdaki bilgilere dayanarak, bir kitap bölümü oluştur:
-        
-        Bölüm Numarası: {chapter_outline.get('number')}
-        Bölüm Başlığı: {chapter_outline.get('title')}
-        Bölüm Özeti: {chapter_outline.get('summary')}
-        
-        Karakterler:
-        {"".join(character_details)}
-        
-        Konumlar:
-        {"".join(location_details)}
-        
-        Ana Olaylar:
-        {', '.join(chapter_outline.get('events', []))}
-        
-        Önceki Bölümler Bağlamı:
-        {previous_chapters_context}
-        
-        İlgili Geçmiş Olaylar:
-        {related_events_str}
-        
-        Bu bölüm için aşağıdaki özelliklerde içerik oluştur:
-        - Akıcı ve sürükleyici anlatım
-        - Karakter gelişimini ve motivasyonlarını yansıtan diyaloglar
-        - Ayrıntılı mekan tasvirleri
-        - Olayların tutarlı bir şekilde ilerlemesi
-        - Belirtilen olayları içermeli ama detayları zenginleştirmeli
-        - Önceki bölümlere ve geçmiş olaylara doğal referanslar
-        
-        Bölüm, tamamen Türkçe olarak, yaklaşık 2000-3000 kelime uzunluğunda olmalıdır. Markdown formatında döndür.
-        """
+        if self.vector_db.events:
+            query_vector = await self.generate_vector(
+                f"{chapter_outline.get('title', '')} {chapter_outline.get('summary', '')} {' '.join(chapter_characters)}"
+            )
+            # Aynı penceredeki bölümlerin olayları da indekste olabilir; yalnızca bağlam sınırına
+            # kadar olanları al ki istem, bölümlerin tamamlanma sırasına bağlı olmasın
+            for event in self.vector_db.search_similar_events(query_vector, k=5, max_chapter=context_cutoff):
+                related_events.append(f"- {event.title}: {event.description}")
+        
+        related_events_str = "\n".join(related_events)  # En fazla 5 ilgili olay
+        
+        # Bölüme özgü kısım; sabit hikaye rehberinden sonra gelir
+        dynamic_suffix = CHAPTER_PROMPT_TEMPLATE.substitute(
+            number=chapter_outline.get('number'),
+            title=chapter_outline.get('title'),
+            summary=chapter_outline.get('summary'),
+            characters=', '.join(chapter_characters),
+            locations=', '.join(chapter_locations),
+            events=', '.join(chapter_outline.get('events', [])),
+            previous_chapters=previous_chapters_context,
+            related_events=related_events_str
+        )
+        
+        chapter_prompt = dynamic_suffix
+        include_bible = True
         
         # İçerik oluşturma denemeleri
         max_retries = 2
@@ -901,17 +1683,28 @@ class StoryGenerator:
         chapter_content = None
         
         while retry_count <= max_retries and not chapter_content:
+            # Bağlam önbelleği varsa rehber yeniden gönderilmez; yoksa (hiç oluşturulmadıysa veya
+            # süresi dolduysa) istemin başına eklenir ki örtük önbellekleme ortak ön eki yakalayabilsin.
+            # Durum her denemede yeniden kontrol edilir, çünkü önbellek çalıştırma sırasında düşebilir.
+            if include_bible and self.gemini_client.cached_model is None:
+                prompt = f"{self._get_story_bible()}\n\n{chapter_prompt}"
+            else:
+                prompt = chapter_prompt
             try:
-                chapter_content = await self.gemini_client.generate_content(chapter_prompt, max_tokens=8192)
-                if not chapter_content or len(chapter_content) < 500:  # Çok kısa içerik, muhtemelen hata var
-                    raise ValueError("Üretilen içerik çok kısa veya boş")
+                # Yeniden denemelerde önbellekteki (kullanılamayan) yanıt tekrar okunmaz
+                chapter_content = await self.gemini_client.generate_content(
+                    prompt, max_tokens=8192, use_context_cache=True, refresh_cache=retry_count > 0,
+                    validate=_check_chapter_content
+                )
+                _check_chapter_content(chapter_content)
             except Exception as e:
                 retry_count += 1
                 logger.error(f"Bölüm {chapter_num} içerik oluşturma hatası ({retry_count}/{max_retries}): {e}")
                 if retry_count <= max_retries:
                     logger.info(f"10 saniye sonra yeniden deneniyor...")
                     await asyncio.sleep(10)
-                    # Daha kısa bir prompt dene
+                    # Daha kısa bir prompt dene (önbellek yoksa rehber eklenmez)
+                    include_bible = False
                     chapter_prompt = f"""
                     Aşağıdaki bilgilere dayanarak, bir kitap bölümü oluştur:
                     
@@ -953,9 +1746,9 @@ class StoryGenerator:
             events=chapter_outline.get('events', [])
         )
         
-        # Bu bölümdeki olayları vektör veritabanına ekle
-        for event_name in chapter_outline.get('events', []):
-            event = Event(
+        # Bu bölümdeki olayları oluştur; vektörleri tek toplu çağrıyla alınacak
+        events = [
+            Event(
                 id=str(uuid.uuid4()),
                 title=event_name,
                 description=f"Bölüm {chapter.number} olayı: {event_name}",
@@ -965,54 +1758,103 @@ class StoryGenerator:
                 following_events=[],
                 chapter=chapter.number
             )
-            vector = await self.generate_vector(f"{event.title} {event.description}")
-            event.vector = vector
-            self.vector_db.add_event(event, vector)
+            for event_name in chapter_outline.get('events', [])
+        ]
         
         # Bölümü kaydet
         chapter_filename = f"output/bolum_{chapter.number:03d}.md"
-        with open(chapter_filename, "w", encoding="utf-8") as f:
-            f.write(f"# Bölüm {chapter.number}: {chapter.title}\n\n")
-            f.write(chapter.content)
+        
+        # Olay embedding'leri ve dosya yazımı birbirinden bağımsız; ikisini aynı anda yürüt
+        vectors, _ = await asyncio.gather(
+            self.generate_vectors([f"{event.title} {event.description}" for event in events]),
+            asyncio.to_thread(self._write_chapter_file, chapter_filename, chapter)
+        )
+        # Arka planda ikili yedek yazılırken indeks değiştirilmesin
+        async with self._db_lock:
+            self.vector_db.bulk_add_events(events, vectors)
         
         logger.info(f"Bölüm {chapter_num} başarıyla oluşturuldu ve {chapter_filename} dosyasına kaydedildi.")
         return chapter
     
+    @staticmethod
+    def _write_chapter_file(filename: str, chapter: Chapter) -> None:
+        """Bölümü kendi Markdown dosyasına yazar."""
+        with open(filename, "w", encoding="utf-8") as f:
+            f.write(f"# Bölüm {chapter.number}: {chapter.title}\n\n")
+            f.write(chapter.content)
+    
     async def generate_full_story(self) -> None:
         """Tüm hikayeyi oluşturur."""
         try:
             # Hikaye evrenini oluştur
             await self.create_universe()
             
+            # Sonraki tüm istemlerde tekrar eden bağlamı önbelleğe al
+            await self._create_story_context_cache()
+            
             # Hikaye taslağını oluştur
             story_outline = await self.generate_story_outline()
             total_chapters = len(story_outline)
             
             logger.info(f"Toplam {total_chapters} bölüm oluşturulacak.")
             
-            # Her bir bölümü oluştur
+            # Kayan pencere: i. bölüm, i-K. bölüme kadar olanlar bitince başlar; böylece aynı anda
+            # en fazla K bölüm üretilir. Önceki bölümlerin başlık/özetleri taslaktan gelir; üretilmiş
+            # çıktıdan gelen ilgili olaylar ise yalnızca tamamlanması beklenen bölümlerden seçilir ki
+            # istem, bölümlerin hangi sırayla tamamlandığından bağımsız olsun
+            window_size = max(1, int(os.getenv('CHAPTER_WINDOW', '5')))
             progress_bar = tqdm(total=total_chapters, desc="Hikaye İlerlemesi", unit="bölüm")
             
-            for chapter_index, chapter_outline in enumerate(story_outline):
+            # Taslak sırasıyla işlenmiş (self.chapters'a eklenmiş veya atlanmış) bölüm sayısı
+            emitted_count = 0
+            emitted = asyncio.Condition()
+            
+            async def run_chapter(index: int, chapter_outline: Dict[str, Any]) -> Optional[Chapter]:
+                context_end = max(0, index - window_size + 1)
+                async with emitted:
+                    await emitted.wait_for(lambda: emitted_count >= context_end)
+                previous_outlines = story_outline[max(0, index - 3):index]
+                # Bağlam sınırı: tamamlanması beklenen son bölümün numarası
+                context_cutoff = story_outline[context_end - 1].get('number', context_end) if context_end else 0
                 try:
-                    # İlerleme bilgisini göster
-                    progress_percent = (chapter_index + 1) / total_chapters * 100
-                    logger.info(f"İlerleme: {chapter_index+1}/{total_chapters} ({progress_percent:.1f}%)")
-                    
-                    chapter = await self.generate_chapter(chapter_outline)
-                    self.chapters.append(chapter)
-                    
-                    # Her 5 bölümde bir, ara sonuçları diske kaydet
-                    if (chapter_index + 1) % 5 == 0 or chapter_index == total_chapters - 1:
-                        self.save_progress()
-                        self.vector_db.save_to_file(f"backup/vector_db_chapter_{chapter_index+1}.json")
-                    
-                    progress_bar.update(1)
-                    
+                    return await self.generate_chapter(chapter_outline, previous_outlines, context_cutoff)
+                except Exception as e:
+                    logger.error(f"Bölüm {chapter_outline.get('number')} oluşturma hatası: {e}")
+                    logger.info(f"Bölüm {chapter_outline.get('number')} bir kez daha deneniyor...")
+                try:
+                    return await self.generate_chapter(chapter_outline, previous_outlines, context_cutoff)
                 except Exception as e:
                     logger.error(f"Bölüm {chapter_outline.get('number')} oluşturma hatası: {e}")
                     logger.info("Bir sonraki bölüme geçiliyor...")
-                    continue
+                    return None
+            
+            tasks = [
+                asyncio.create_task(run_chapter(index, chapter_outline))
+                for index, chapter_outline in enumerate(story_outline)
+            ]
+            try:
+                # Sonuçları taslak sırasıyla işle
+                for index, task in enumerate(tasks):
+                    chapter = await task
+                    if chapter is not None:
+                        self.chapters.append(chapter)
+                    async with emitted:
+                        emitted_count += 1
+                        emitted.notify_all()
+                    progress_bar.update(1)
+                    
+                    # Her K bölümde bir, ara sonuçları diske kaydet
+                    done = index + 1
+                    if done % window_size == 0 or done == total_chapters:
+                        logger.info(f"İlerleme: {done}/{total_chapters} ({done / total_chapters * 100:.1f}%)")
+                        await self.save_progress()
+                        await self.gemini_client.refresh_context_cache()
+                        self.vector_db.save_to_file(f"backup/vector_db_chapter_{done}.json")
+                        async with self._db_lock:
+                            await asyncio.to_thread(self.vector_db.save_binary)
+            finally:
+                for task in tasks:
+                    task.cancel()
             
             progress_bar.close()
             
@@ -1022,22 +1864,56 @@ class StoryGenerator:
         except Exception as e:
             logger.error(f"Hikaye oluşturma işleminde kritik hata: {e}")
             # Son durumu kaydet
-            self.save_progress()
+            await self.save_progress()
             self.vector_db.save_to_file("backup/vector_db_error_state.json")
+            async with self._db_lock:
+                await asyncio.to_thread(self.vector_db.save_binary)
             raise
+        finally:
+            await self.gemini_client.delete_context_cache()
+            # Kuyruktaki yedeklerin diske yazılmasını bekle
+            await asyncio.to_thread(backup_writer.flush)
         
-    def save_progress(self) -> None:
-        """Mevcut ilerlemeyi diske kaydeder."""
+    @staticmethod
+    def _write_draft(chapters: List[Chapter], mode: str) -> None:
+        """Bölümleri taslak dosyasına yazar ("w": baştan, "a": sonuna ekle)."""
+        with open("output/kitap_taslak.md", mode, encoding="utf-8") as f:
+            for chapter in chapters:
+                f.write(f"# Bölüm {chapter.number}: {chapter.title}\n\n")
+                f.write(chapter.content)
+                f.write("\n\n---\n\n")
+    
+    async def save_progress(self) -> None:
+        """Mevcut ilerlemeyi diske kaydeder; disk yazımları olay döngüsünü bloklamaz."""
         logger.info("İlerleme kaydediliyor...")
         
-        # Mevcut içeriği Markdown olarak kaydet
-        with open("output/kitap_taslak.md", "w", encoding="utf-8") as f:
+        # Yalnızca son kayıttan sonra eklenen bölümleri taslağın sonuna yaz;
+        # ilk kayıtta önceki çalıştırmadan kalan taslak sıfırlanır
+        mode = "a" if self._saved_chapter_count else "w"
+        new_chapters = self.chapters[self._saved_chapter_count:]
+        self._saved_chapter_count = len(self.chapters)
+        
+        await asyncio.gather(
+            asyncio.to_thread(self._write_draft, new_chapters, mode),
+            asyncio.to_thread(self.embedding_cache.save)
+        )
+        logger.info("İlerleme başarıyla kaydedildi: output/kitap_taslak.md")
+    
+    def _write_book(self, path: str, book_title: str, foreword: str,
+                    characters_summary: str, locations_summary: str, appendix: str) -> None:
+        """Nihai kitabı bölüm bölüm dosyaya akıtarak yazar."""
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"# {book_title}\n\n## Ön Söz\n\n{foreword}\n\n---\n\n")
+            
+            # Bölümleri ekle (self.chapters zaten bölüm sırasında)
             for chapter in self.chapters:
                 f.write(f"# Bölüm {chapter.number}: {chapter.title}\n\n")
                 f.write(chapter.content)
                 f.write("\n\n---\n\n")
-        
-        logger.info("İlerleme başarıyla kaydedildi: output/kitap_taslak.md")
+            
+            # Karakter ve konum listelerini ve ekleri ekle
+            f.write(f"\n# Karakterler\n\n{characters_summary}\n\n# Konumlar\n\n{locations_summary}\n\n")
+            f.write(f"# Ek Bilgiler\n\n{appendix}\n")
     
     async def finalize_book(self) -> None:
         """Nihai kitabı oluşturur ve biçimlendirir."""
@@ -1055,7 +1931,7 @@ class StoryGenerator:
         """
         
         logger.info("Kitap başlığı oluşturuluyor...")
-        book_title = await self.gemini_client.generate_content(title_prompt)
+        book_title = await self.gemini_client.generate_content(title_prompt, service_tier="flex")
         
         foreword_prompt = f"""
         Aşağıdaki kitap için bir ön söz yaz:
@@ -1069,7 +1945,7 @@ class StoryGenerator:
         """
         
         logger.info("Ön söz oluşturuluyor...")
-        foreword = await self.gemini_client.generate_content(foreword_prompt)
+        foreword = await self.gemini_client.generate_content(foreword_prompt, use_context_cache=True, service_tier="flex")
         
         # Karakterler listesini oluştur
         characters_summary = []
@@ -1094,48 +1970,17 @@ class StoryGenerator:
         """
         
         logger.info("Ek bilgiler oluşturuluyor...")
-        appendix = await self.gemini_client.generate_content(appendix_prompt)
-        
-        # Tüm içeriği Markdown olarak birleştir
-        logger.info("Kitap içeriği birleştiriliyor...")
-        markdown_content = f"""# {book_title}
-
-## Ön Söz
-
-{foreword}
-
----
-
-"""
+        appendix = await self.gemini_client.generate_content(appendix_prompt, use_context_cache=True, service_tier="flex")
         
-        # Bölümleri ekle
-        for chapter in sorted(self.chapters, key=lambda c: c.number):
-            markdown_content += f"# Bölüm {chapter.number}: {chapter.title}\n\n"
-            markdown_content += chapter.content
-            markdown_content += "\n\n---\n\n"
-        
-        # Karakter listesini ekle
-        markdown_content += f"""
-# Karakterler
-
-{"".join(characters_summary)}
-
-# Konumlar
-
-{"".join(locations_summary)}
-
-# Ek Bilgiler
-
-{appendix}
-"""
-        
-        # Markdown dosyasını kaydet
+        # Kitabı bellekte tek bir dizgide birleştirmeden parça parça doğrudan dosyaya yaz
         logger.info("Kitap Markdown olarak kaydediliyor...")
-        with open("output/kitap.md", "w", encoding="utf-8") as f:
-            f.write(markdown_content)
+        await asyncio.to_thread(
+            self._write_book, "output/kitap.md", book_title, foreword,
+            "".join(characters_summary), "".join(locations_summary), appendix
+        )
         
         # PDF dosyasına dönüştür
-        pdf_success = generate_pdf_from_markdown(markdown_content, "output/kitap.pdf")
+        pdf_success = await asyncio.to_thread(generate_pdf_from_markdown, "output/kitap.md", "output/kitap.pdf")
         
         logger.info("Kitap başarıyla oluşturuldu ve kaydedildi:")
         logger.info("- output/kitap.md (Markdown formatı)")
@@ -1147,15 +1992,23 @@ class StoryGenerator:
             logger.warning("2. Markdown dosyasını bir online dönüştürücü ile PDF'e çevirin")
             logger.warning("3. Pandoc kullanarak dönüştürün: pandoc -s output/kitap.md -o output/kitap.pdf")
 
+def _markdown_to_html(markdown_content: str) -> str:
+    """Markdown'ı HTML'e çevirir; mistune kuruluysa onu kullanır."""
+    if HAS_MISTUNE:
+        return mistune.html(markdown_content)
+    return markdown.markdown(markdown_content)
+
 # PDF oluşturma yardımcı fonksiyonu
-def generate_pdf_from_markdown(markdown_content: str, output_path: str) -> bool:
-    """Markdown içeriğinden PDF oluşturur."""
+def generate_pdf_from_markdown(markdown_path: str, output_path: str) -> bool:
+    """Markdown dosyasından PDF oluşturur."""
     try:
         # Önce WeasyPrint'i deneyelim
         if HAS_WEASYPRINT:
             try:
                 logger.info("WeasyPrint ile PDF oluşturuluyor...")
-                html = markdown.markdown(markdown_content)
+                from weasyprint import HTML
+                with open(markdown_path, "r", encoding="utf-8") as f:
+                    html = _markdown_to_html(f.read())
                 HTML(string=html).write_pdf(output_path)
                 logger.info(f"PDF başarıyla oluşturuldu: {output_path}")
                 return True
@@ -1163,13 +2016,7 @@ def generate_pdf_from_markdown(markdown_content: str, output_path: str) -> bool:
                 logger.error(f"WeasyPrint hatası: {e}")
                 logger.info("Pandoc ile deneniyor...")
         
-        # WeasyPrint çalışmazsa, Pandoc'u kullanalım        
-        # Geçici markdown dosyası oluştur
-        temp_md_path = f"{output_path}.temp.md"
-        with open(temp_md_path, "w", encoding="utf-8") as f:
-            f.write(markdown_content)
-        
-        # Pandoc'u çalıştır
+        # WeasyPrint çalışmazsa, Pandoc'u doğrudan Markdown dosyası üzerinde çalıştıralım
         logger.info("Pandoc ile PDF oluşturuluyor...")
         import subprocess
         
@@ -1178,18 +2025,12 @@ def generate_pdf_from_markdown(markdown_content: str, output_path: str) -> bool:
         env["PATH"] = "/Library/TeX/texbin:" + env["PATH"]
         
         result = subprocess.run(
-            ["pandoc", temp_md_path, "-o", output_path, "--pdf-engine=xelatex"],
+            ["pandoc", markdown_path, "-o", output_path, "--pdf-engine=xelatex"],
             capture_output=True,
             text=True,
             env=env
         )
         
-        # Geçici dosyayı temizle
-        try:
-            os.remove(temp_md_path)
-        except:
-            pass
-        
         if result.returncode == 0:
             logger.info(f"PDF başarıyla oluşturuldu: {output_path}")
             return True
@@ -1239,6 +2080,7 @@ async def main():
     parser.add_argument('--api-key', type=str, help='Gemini API anahtarı (varsayılan: GEMINI_API_KEY çevre değişkeni)')
     parser.add_argument('--chapter-start', type=int, default=1, help='Başlangıç bölüm numarası')
     parser.add_argument('--chapter-end', type=int, default=None, help='Bitiş bölüm numarası')
+    parser.add_argument('--no-cache', action='store_true', help='Gemini yanıt önbelleğini (backup/llm_cache) kullanma')
     args = parser.parse_args()
     
     # .env dosyasının varlığını kontrol et
@@ -1272,7 +2114,7 @@ async def main():
         config = ConfigParser.parse_config(args.config)
         
         # Hikaye oluşturucuyu başlat
-        generator = StoryGenerator(config, api_key)
+        generator = StoryGenerator(config, api_key, use_response_cache=not args.no_cache)
         
         # Yapılandırma özetini göster
         print("\n" + "="*60)
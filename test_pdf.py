@@ -7,31 +7,435 @@ Bu basit betik PDF oluşturma metodlarını test eder.
 """
 
 import os
+import io
 import sys
+import json
+import argparse
+import time
+import atexit
+import shutil
+import signal
+import textwrap
+import hashlib
+import tempfile
+import threading
 import logging
 import markdown
 import subprocess
+import functools
 import importlib.util
+import urllib.error
+import urllib.request
+from enum import Enum
+from pathlib import Path
+from collections import deque
+from dataclasses import dataclass
+from typing import Iterator, Optional, Sequence
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-# Loglama yapılandırması
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Loglama yapılandırması (modül yeniden import edilirse ikinci bir handler eklenmez)
+if not logging.getLogger().hasHandlers():
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
 logger = logging.getLogger("PDFTest")
 
-# WeasyPrint kullanılabilirlik kontrolü
-HAS_WEASYPRINT = importlib.util.find_spec("weasyprint") is not None
+# Test çıktı dizini (her çağrıda yeniden kontrol edilmez)
+Path("output").mkdir(exist_ok=True)
 
-def test_pdf_generation():
-    """PDF oluşturma yöntemlerini test eder."""
-    logger.info("PDF oluşturma testi başlatılıyor...")
+@functools.lru_cache(maxsize=None)
+def _load_weasyprint():
+    """WeasyPrint'i (cairo/pango bağlamalarıyla birlikte) yalnızca ilk kullanımda import eder.
+
+    Paket kurulu değilse ImportError yükseltir.
+    """
+    from weasyprint import HTML
+    return HTML
+
+# cmarkgfm (libcmark-gfm C eklentisi) varsa Markdown onunla ayrıştırılır
+try:
+    import cmarkgfm
+    HAS_CMARKGFM = True
+except ImportError:
+    HAS_CMARKGFM = False
+
+# Sistem fontlarının fontconfig ile yeniden taranmaması için paylaşılan yapılandırma
+_FONT_CONFIG = None
+
+def _get_font_config():
+    """WeasyPrint FontConfiguration nesnesini ilk kullanımda oluşturup saklar."""
+    global _FONT_CONFIG
+    if _FONT_CONFIG is None:
+        from weasyprint.text.fonts import FontConfiguration
+        _FONT_CONFIG = FontConfiguration()
+    return _FONT_CONFIG
+
+def _local_url_fetcher(url):
+    """Yalnızca data: ve yerel dosya URL'lerini yükler; ağ isteği yapılmaz."""
+    from weasyprint import default_url_fetcher
+    if url.startswith(("data:", "file:")):
+        return default_url_fetcher(url)
+    raise ValueError(f"Uzak kaynak yüklenmedi: {url}")
+
+def _markdown_to_html(markdown_content):
+    """Markdown içeriğini tablo desteğiyle HTML'e dönüştürür."""
+    if HAS_CMARKGFM:
+        return cmarkgfm.github_flavored_markdown_to_html(markdown_content)
+    return markdown.markdown(markdown_content, extensions=['tables'])
+
+def _render_weasyprint(html_content):
+    """HTML içeriğini WeasyPrint ile bellekte PDF'e dönüştürür ve baytlarını döndürür."""
+    HTML = _load_weasyprint()
+    buffer = io.BytesIO()
+    HTML(string=html_content, url_fetcher=_local_url_fetcher).write_pdf(
+        target=buffer, font_config=_get_font_config()
+    )
+    return buffer.getvalue()
+
+def _run_weasyprint(html_content, output_path):
+    """Önceden dönüştürülmüş HTML içeriğini WeasyPrint ile PDF'e dönüştürür."""
+    logger.info("WeasyPrint testi başlatılıyor...")
+    # WeasyPrint'i güvenli bir şekilde import et
+    _load_weasyprint()
+    logger.info("WeasyPrint başarıyla import edildi.")
+    
+    # PDF'i bellekte oluşturup diske tek seferde yaz
+    Path(output_path).write_bytes(_render_weasyprint(html_content))
+
+# MacTeX kurulumundan sonra terminal yeniden başlatılmadan da xelatex bulunabilsin
+TEX_BIN_DIR = "/Library/TeX/texbin"
+
+# TeX önbellek dizini; baskı ve dijital sürümler aynı sıcak önbelleği paylaşır
+TEXMF_CACHE_DIR = os.path.expanduser("~/.cache/texmf")
+
+# Aynı Markdown kaynağından üretilen PDF sürümleri ve Pandoc şablon değişkenleri.
+# Baskı sürümünde bağlantılar dipnot olarak yazılır, dijital sürümde renkli bağlantılar kullanılır.
+PDF_VARIANTS = {
+    "print": ["links-as-notes"],
+    "digital": ["colorlinks"],
+}
+
+def _find_xelatex():
+    """xelatex'in mutlak yolunu önce PATH'te, sonra TeX dizininde arar."""
+    return shutil.which("xelatex") or shutil.which("xelatex", path=TEX_BIN_DIR)
+
+# İkili dosyaların yolları süreç boyunca değişmediğinden bir kez çözümlenir.
+# Üretimdeki generate_pdf_from_markdown ile aynı motor (xelatex) test edilir.
+_PANDOC = shutil.which("pandoc")
+_XELATEX = _find_xelatex()
+
+# TeX ortamı bir kez oluşturulur: ortak önbellek dizini (TEXMFVAR, yani kullanıcının TeX
+# yapılandırması değiştirilmez) ve TeX dizini PATH'te değilse (xelatex, xdvipdfmx gibi
+# yardımcı araçlarını PATH üzerinden çağırır) genişletilmiş PATH
+_TEX_ENV = dict(os.environ, TEXMFCACHE=TEXMF_CACHE_DIR)
+if _XELATEX and shutil.which("xelatex") is None:
+    _TEX_ENV["PATH"] = os.path.dirname(_XELATEX) + os.pathsep + os.environ.get("PATH", "")
+
+# Bazı girdilerde pandoc/LaTeX süresiz takılabildiğinden alt süreçler bu süre sonunda sonlandırılır
+PANDOC_TIMEOUT = 120
+
+def _run_with_timeout(command, timeout=PANDOC_TIMEOUT):
+    """Komutu süre sınırıyla çalıştırır, çıktısını satır satır debug olarak loglar.
+
+    (returncode, son çıktı satırları) döndürür; süre aşılırsa RuntimeError yükseltir.
+    """
+    process = subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        env=_TEX_ENV,
+        # pandoc'un başlattığı LaTeX süreçleri de birlikte sonlandırılabilsin
+        start_new_session=(os.name == "posix")
+    )
+    timed_out = threading.Event()
+    
+    def _kill():
+        timed_out.set()
+        try:
+            if os.name == "posix":
+                os.killpg(process.pid, signal.SIGKILL)
+            else:
+                process.kill()
+        except ProcessLookupError:
+            pass
+    
+    timer = threading.Timer(timeout, _kill)
+    timer.start()
+    # Hata mesajı için yalnızca son satırlar tutulur
+    tail = deque(maxlen=50)
+    debug = logger.isEnabledFor(logging.DEBUG)
+    try:
+        for line in process.stdout:
+            tail.append(line)
+            if debug:
+                logger.debug("%s", line.decode("utf-8", errors="replace").rstrip())
+        process.wait()
+    finally:
+        timer.cancel()
+        process.stdout.close()
+    
+    if timed_out.is_set():
+        raise RuntimeError(f"{os.path.basename(command[0])} zaman aşımı ({timeout} sn)")
+    return process.returncode, b"".join(tail)
+
+# Uzun ömürlü pandoc-server ayarları (Haskell çalışma zamanı her çağrıda yeniden başlatılmaz)
+PANDOC_SERVER_PORT = 3030
+PANDOC_SERVER_URL = f"http://127.0.0.1:{PANDOC_SERVER_PORT}"
+_pandoc_server_process = None
+_pandoc_server_lock = threading.Lock()
+
+def _pandoc_server_alive():
+    """pandoc-server'ın yanıt verip vermediğini kontrol eder."""
+    try:
+        with urllib.request.urlopen(f"{PANDOC_SERVER_URL}/version", timeout=1):
+            return True
+    except (urllib.error.URLError, OSError):
+        return False
+
+def _stop_pandoc_server():
+    """Bu betiğin başlattığı pandoc-server sürecini kapatır."""
+    if _pandoc_server_process is not None and _pandoc_server_process.poll() is None:
+        _pandoc_server_process.terminate()
+
+def _ensure_pandoc_server():
+    """pandoc-server çalışmıyorsa bir kez başlatır; kullanılabilirse True döndürür."""
+    # Eşzamanlı dönüşümlerin birden fazla sunucu başlatmasını engelle
+    with _pandoc_server_lock:
+        return _start_pandoc_server()
+
+def _start_pandoc_server():
+    """pandoc-server sürecini başlatır ve dinlemeye başlamasını bekler."""
+    global _pandoc_server_process
+    if _pandoc_server_alive():
+        return True
+    if _pandoc_server_process is None:
+        try:
+            _pandoc_server_process = subprocess.Popen(
+                [_PANDOC, "server", "--port", str(PANDOC_SERVER_PORT)],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
+            )
+        except OSError as e:
+            logger.warning("pandoc-server başlatılamadı: %s", e)
+            return False
+        atexit.register(_stop_pandoc_server)
+    
+    # Sunucunun dinlemeye başlamasını kısa bir süre bekle
+    for _ in range(50):
+        if _pandoc_server_process.poll() is not None:
+            logger.warning("pandoc-server beklenmedik şekilde kapandı.")
+            return False
+        if _pandoc_server_alive():
+            return True
+        time.sleep(0.1)
+    return False
+
+# LaTeX motorunun en fazla kaç kez çalıştırılacağı (pandoc komutuyla aynı üst sınır)
+LATEX_MAX_RUNS = 3
+
+def _variant_output_path(output_path, variant):
+    """Dijital sürüm ana çıktı yoluna, diğer sürümler sonek eklenmiş yola yazılır."""
+    if variant == "digital":
+        return output_path
+    root, ext = os.path.splitext(output_path)
+    return f"{root}_{variant}{ext}"
+
+def _convert_with_pandoc_server(markdown_content, output_path, variables):
+    """Markdown'ı pandoc-server ile LaTeX'e çevirir ve xelatex ile PDF oluşturur.
+
+    pandoc-server PDF motoru çalıştırmadığından yalnızca Markdown → LaTeX
+    dönüşümü sunucuda yapılır; PDF adımı doğrudan xelatex ile tamamlanır.
+    """
+    request = urllib.request.Request(
+        PANDOC_SERVER_URL,
+        data=json.dumps({
+            "text": markdown_content,
+            "from": "markdown",
+            "to": "latex",
+            "standalone": True,
+            "variables": {name: True for name in variables}
+        }).encode("utf-8"),
+        headers={"Content-Type": "application/json", "Accept": "text/plain"}
+    )
+    with urllib.request.urlopen(request, timeout=60) as response:
+        latex_content = response.read()
+    
+    # Ara dosyalar (.tex, .aux, .log) geçici dizinde kalır; output/ içine yalnızca PDF taşınır
+    with tempfile.TemporaryDirectory() as work_dir:
+        tex_path = os.path.join(work_dir, "document.tex")
+        aux_path = os.path.join(work_dir, "document.aux")
+        with open(tex_path, "wb") as f:
+            f.write(latex_content)
+        
+        # pandoc komutu gibi, çapraz başvurular ve içindekiler oturana (.aux değişmeyene) kadar
+        # motoru yeniden çalıştır
+        previous_aux = None
+        for _ in range(LATEX_MAX_RUNS):
+            result = _run_with_timeout(
+                [_XELATEX, "-interaction=nonstopmode", "-halt-on-error",
+                 f"-output-directory={work_dir}", tex_path]
+            )
+            if result[0] != 0:
+                return result
+            try:
+                aux = Path(aux_path).read_bytes()
+            except FileNotFoundError:
+                break
+            if aux == previous_aux:
+                break
+            previous_aux = aux
+        
+        shutil.move(os.path.join(work_dir, "document.pdf"), output_path)
+    return result
+
+def _run_pandoc(md_path, output_path):
+    """Markdown dosyasından Pandoc ve xelatex ile baskı ve dijital PDF'ler oluşturur.
+
+    Sürümler sırayla üretilir; ilk çalıştırma ortak TeX önbelleğini ısıttığından
+    ikinci sürüm daha az başlangıç maliyetiyle üretilir.
+    """
+    logger.info("Pandoc testi başlatılıyor...")
+    if _PANDOC is None:
+        raise RuntimeError("pandoc bulunamadı")
+    if _XELATEX is None:
+        raise RuntimeError("xelatex bulunamadı")
+    
+    use_server = _ensure_pandoc_server()
+    if use_server:
+        with open(md_path, "r", encoding="utf-8") as f:
+            markdown_content = f.read()
+    
+    for variant, variables in PDF_VARIANTS.items():
+        variant_path = _variant_output_path(output_path, variant)
+        
+        result = None
+        if use_server:
+            try:
+                result = _convert_with_pandoc_server(markdown_content, variant_path, variables)
+            except (urllib.error.URLError, OSError) as e:
+                logger.warning("pandoc-server dönüşümü başarısız, pandoc komutuna dönülüyor: %s", e)
+                use_server = False
+        
+        if result is None:
+            command = [_PANDOC, md_path, "-o", variant_path, f"--pdf-engine={_XELATEX}"]
+            for name in variables:
+                command += ["-V", name]
+            result = _run_with_timeout(command)
+        
+        # Çıktı yalnızca hata durumunda bir kez daha çözümlenir
+        returncode, output = result
+        if returncode != 0:
+            raise RuntimeError(output.decode("utf-8", errors="replace"))
+        logger.info("%s PDF sürümü oluşturuldu: %s", variant, variant_path)
+
+class ConversionStatus(Enum):
+    """Tek bir dönüşümün sonucu."""
+    SUCCESS = "success"
+    FAILURE = "failure"
+    # Çıktı kaynaktan daha yeni olduğu için motor çalıştırılmadı (motorun çalıştığı doğrulanmadı)
+    SKIPPED = "skipped"
+
+@dataclass
+class ConversionResult:
+    """Bir Markdown kaynağının belirli bir motorla PDF'e dönüşüm sonucu."""
+    source: str
+    engine: str
+    status: ConversionStatus
+    output_path: str
+    error: Optional[str] = None
+
+ENGINE_NAMES = {"weasyprint": "WeasyPrint", "pandoc": "Pandoc"}
+
+def _write_if_changed(path, content):
+    """İçerik özeti değiştiyse dosyayı ve yanındaki .hash dosyasını yazar.
+
+    Dosya yazıldıysa True, içerik aynı olduğu için atlandıysa False döndürür.
+    """
+    digest = hashlib.blake2b(content.encode("utf-8"), digest_size=16).digest()
+    hash_path = f"{path}.hash"
+    try:
+        with open(hash_path, "rb") as f:
+            if f.read() == digest and os.path.exists(path):
+                return False
+    except FileNotFoundError:
+        pass
+    
+    # Geçici dosyaya yazıp atomik olarak yeniden adlandır; süreç yarıda kesilirse
+    # motorlar hiçbir zaman yarım kalmış bir dosya okumaz
+    tmp_path = Path(f"{path}.tmp")
+    tmp_path.write_text(content, encoding="utf-8")
+    os.replace(tmp_path, path)
+    
+    tmp_hash_path = Path(f"{hash_path}.tmp")
+    tmp_hash_path.write_bytes(digest)
+    os.replace(tmp_hash_path, hash_path)
+    return True
+
+def _engine_outputs(engine, output_path):
+    """Motorun ürettiği tüm PDF dosyalarının yollarını döndürür."""
+    if engine == "pandoc":
+        return [_variant_output_path(output_path, variant) for variant in PDF_VARIANTS]
+    return [output_path]
+
+def _is_up_to_date(source, output_paths):
+    """Tüm PDF'ler kaynağın içerik özetinden daha yeniyse yeniden oluşturmaya gerek yoktur."""
+    try:
+        hash_mtime = os.path.getmtime(f"{source}.hash")
+        return all(os.path.getmtime(path) > hash_mtime for path in output_paths)
+    except OSError:
+        return False
+
+def _convert_one(source, engine, force=False):
+    """Tek bir Markdown dosyasını seçilen motorla PDF'e dönüştürür.
+
+    force=True ise güncel çıktılar olsa bile motor yeniden çalıştırılır.
+    """
+    output_path = f"{os.path.splitext(source)[0]}_{engine}.pdf"
+    engine_name = ENGINE_NAMES[engine]
+    
+    if not force and _is_up_to_date(source, _engine_outputs(engine, output_path)):
+        logger.info("%s çıktısı güncel, yeniden oluşturulmadı: %s", engine_name, output_path)
+        return ConversionResult(source, engine, ConversionStatus.SKIPPED, output_path)
     
-    # Test çıktı dizini
-    os.makedirs("output", exist_ok=True)
+    try:
+        if engine == "weasyprint":
+            with open(source, "r", encoding="utf-8") as f:
+                html_content = _markdown_to_html(f.read())
+            _run_weasyprint(html_content, output_path)
+        else:
+            _run_pandoc(source, output_path)
+    except ImportError:
+        logger.warning("WeasyPrint paketi bulunamadı. WeasyPrint testi atlanıyor.")
+        return ConversionResult(source, engine, ConversionStatus.FAILURE, output_path,
+                                "WeasyPrint paketi bulunamadı")
+    except Exception as e:
+        logger.error("%s hatası: %s", engine_name, e)
+        return ConversionResult(source, engine, ConversionStatus.FAILURE, output_path, str(e))
+    
+    logger.info("PDF başarıyla oluşturuldu: %s", output_path)
+    return ConversionResult(source, engine, ConversionStatus.SUCCESS, output_path)
+
+def convert_all(sources: Sequence[str],
+                engines: Sequence[str] = ("weasyprint", "pandoc"),
+                force: bool = False) -> Iterator[ConversionResult]:
+    """Markdown kaynaklarını tüm motorlarla eşzamanlı dönüştürür.
+
+    Sonuçlar biriktirilmeden, tamamlandıkları sırayla döndürülür. force=True içerik özeti
+    kontrolünü devre dışı bırakır.
+    """
+    jobs = [(source, engine) for source in sources for engine in engines]
+    if not jobs:
+        return
     
-    # Basit Markdown içeriği oluştur
-    markdown_content = """
+    max_workers = min(len(jobs), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_convert_one, source, engine, force) for source, engine in jobs]
+        for future in as_completed(futures):
+            yield future.result()
+
+# Test için kullanılan Markdown içeriği (her çağrıda yeniden oluşturulmaz)
+_TEST_MARKDOWN = textwrap.dedent("""
 # PDF Test Belgesi
 
 Bu belge, PDF oluşturma yeteneklerini test etmek için oluşturulmuştur.
@@ -54,59 +458,21 @@ Bu belge, PDF oluşturma yeteneklerini test etmek için oluşturulmuştur.
 ---
 
 Eğer bu PDF doğru bir şekilde oluşturulduysa, test başarılı demektir.
-    """
-    
-    # Markdown dosyasını kaydet
-    with open("output/test.md", "w", encoding="utf-8") as f:
-        f.write(markdown_content)
-    
-    logger.info("Test Markdown dosyası oluşturuldu: output/test.md")
+""").strip()
+
+def test_pdf_generation(force=False):
+    """PDF oluşturma yöntemlerini test eder; her motor için ConversionStatus döndürür."""
+    logger.info("PDF oluşturma testi başlatılıyor...")
     
-    # WeasyPrint ile dene
-    weasyprint_success = False
-    if HAS_WEASYPRINT:
-        try:
-            logger.info("WeasyPrint testi başlatılıyor...")
-            # WeasyPrint'i güvenli bir şekilde import et
-            from weasyprint import HTML
-            logger.info("WeasyPrint başarıyla import edildi.")
-            
-            # HTML'e dönüştür
-            html_content = markdown.markdown(markdown_content)
-            
-            # PDF oluştur
-            HTML(string=html_content).write_pdf("output/test_weasyprint.pdf")
-            logger.info("PDF başarıyla oluşturuldu: output/test_weasyprint.pdf")
-            weasyprint_success = True
-        except Exception as e:
-            logger.error(f"WeasyPrint hatası: {e}")
+    # Markdown dosyasını yalnızca içerik değiştiyse kaydet
+    if _write_if_changed("output/test.md", _TEST_MARKDOWN):
+        logger.info("Test Markdown dosyası oluşturuldu: output/test.md")
     else:
-        logger.warning("WeasyPrint paketi bulunamadı. WeasyPrint testi atlanıyor.")
-    
-    # Pandoc ile dene
-    pandoc_success = False
-    try:
-        logger.info("Pandoc testi başlatılıyor...")
-        # Önce PATH'i güncelleyelim (terminal yeniden başlatma gerekmeden)
-        env = os.environ.copy()
-        env["PATH"] = "/Library/TeX/texbin:" + env["PATH"]
-        
-        result = subprocess.run(
-            ["pandoc", "output/test.md", "-o", "output/test_pandoc.pdf", "--pdf-engine=xelatex"],
-            capture_output=True,
-            text=True,
-            env=env
-        )
-        
-        if result.returncode == 0:
-            logger.info("PDF başarıyla oluşturuldu: output/test_pandoc.pdf")
-            pandoc_success = True
-        else:
-            logger.error(f"Pandoc hatası: {result.stderr}")
-    except Exception as e:
-        logger.error(f"Pandoc hatası: {e}")
+        logger.info("Test Markdown dosyası değişmedi: output/test.md")
     
-    return weasyprint_success, pandoc_success
+    # İki motor birbirinden bağımsız olduğundan eşzamanlı çalıştırılır
+    results = {result.engine: result for result in convert_all(["output/test.md"], force=force)}
+    return results["weasyprint"].status, results["pandoc"].status
 
 def suggest_alternatives():
     """PDF oluşturma için alternatif yöntemler önerir."""
@@ -116,18 +482,35 @@ def suggest_alternatives():
     logger.info("3. Markdown Online Dönüştürücüler kullanarak.")
     logger.info("4. Markdown PDF VSCode eklentisi.")
 
+def _print_skipped(engine_name):
+    """Önbellek nedeniyle çalıştırılmayan motoru raporlar."""
+    print(f"⏭️  {engine_name} testi atlandı (önbellekte güncel PDF var, motor çalıştırılmadı).")
+    print("   Motoru yeniden test etmek için: python test_pdf.py --force (veya PDF_TEST_FORCE=1)")
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="PDF oluşturma yöntemlerini test eder")
+    parser.add_argument("--force", action="store_true",
+                        default=os.getenv("PDF_TEST_FORCE", "") not in ("", "0"),
+                        help="İçerik değişmemiş olsa bile PDF'leri yeniden oluştur")
+    args = parser.parse_args()
+    
     print("PDF oluşturma testleri başlatılıyor...")
-    weasyprint_success, pandoc_success = test_pdf_generation()
+    weasyprint_status, pandoc_status = test_pdf_generation(force=args.force)
+    weasyprint_success = weasyprint_status == ConversionStatus.SUCCESS
+    pandoc_success = pandoc_status == ConversionStatus.SUCCESS
+    skipped = ConversionStatus.SKIPPED in (weasyprint_status, pandoc_status)
     
     print("\n----- Test Sonuçları -----")
     
     if weasyprint_success:
         print("✅ WeasyPrint testi başarılı! PDF oluşturuldu.")
         print("   Oluşturulan PDF: output/test_weasyprint.pdf")
+    elif weasyprint_status == ConversionStatus.SKIPPED:
+        _print_skipped("WeasyPrint")
     else:
         print("❌ WeasyPrint testi başarısız.")
-        if HAS_WEASYPRINT:
+        # Kurulum durumu yalnızca başarısızlık raporlanırken kontrol edilir
+        if importlib.util.find_spec("weasyprint") is not None:
             print("   WeasyPrint paketi yüklü, ancak çalıştırılamadı.")
             print("   Gerekli sistem bağımlılıklarını yüklemek için:")
             print("   brew install pango cairo gdk-pixbuf gobject-introspection libffi")
@@ -136,19 +519,23 @@ if __name__ == "__main__":
     
     if pandoc_success:
         print("✅ Pandoc testi başarılı! PDF oluşturuldu.")
-        print("   Oluşturulan PDF: output/test_pandoc.pdf")
+        print("   Oluşturulan PDF'ler: output/test_pandoc.pdf (dijital), output/test_pandoc_print.pdf (baskı)")
+    elif pandoc_status == ConversionStatus.SKIPPED:
+        _print_skipped("Pandoc")
     else:
         print("❌ Pandoc testi başarısız.")
         print("   Pandoc kurulu değil veya çalıştırılamadı.")
         print("   Yüklemek için: brew install pandoc")
     
-    if not weasyprint_success and not pandoc_success:
-        print("\n❌ Tüm testler başarısız!")
-        suggest_alternatives()
-    else:
+    if weasyprint_success or pandoc_success:
         print("\n✅ En az bir PDF oluşturma yöntemi çalışıyor!")
         
         if pandoc_success:
             print("☞ Pandoc kullanarak PDF oluşturulabilir.")
         elif weasyprint_success:
-            print("☞ WeasyPrint kullanarak PDF oluşturulabilir.") 
\ No newline at end of file
+            print("☞ WeasyPrint kullanarak PDF oluşturulabilir.")
+    elif skipped:
+        print("\n⏭️  Bu çalıştırmada hiçbir motor doğrulanmadı; sonuç için --force ile yeniden çalıştırın.")
+    else:
+        print("\n❌ Tüm testler başarısız!")
+        suggest_alternatives()
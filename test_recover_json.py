@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JSON Kurtarma Testleri
+
+Model yanıtlarındaki JSON dizilerini yerelde kurtaran _recover_json fonksiyonunu
+sık karşılaşılan hata biçimlerine karşı test eder.
+"""
+
+import json
+import unittest
+
+from story_generator import _recover_json, _require_objects
+
+
+class RecoverJsonTest(unittest.TestCase):
+    """_recover_json ve _require_objects için testler."""
+
+    def test_clean_array(self):
+        self.assertEqual(_recover_json('[{"a": 1}, {"a": 2}]'), [{"a": 1}, {"a": 2}])
+
+    def test_fenced_array(self):
+        text = '```json\n[{"name": "Ali"}]\n```'
+        self.assertEqual(_recover_json(text), [{"name": "Ali"}])
+
+    def test_prose_wrapped_array(self):
+        text = 'Tabii! İşte liste:\n[{"name": "Ali"}]\nUmarım beğenirsiniz [not].'
+        self.assertEqual(_recover_json(text), [{"name": "Ali"}])
+
+    def test_bracket_in_leading_prose(self):
+        text = 'Not [kaynak]: aşağıdaki dizi istenen biçimde.\n[{"name": "Ali"}]'
+        self.assertEqual(_recover_json(text), [{"name": "Ali"}])
+
+    def test_nested_arrays_are_kept(self):
+        text = 'Sonuç: [{"name": "Ali", "traits": ["cesur", "sadık"]}] bitti.'
+        self.assertEqual(_recover_json(text), [{"name": "Ali", "traits": ["cesur", "sadık"]}])
+
+    def test_truncated_array_keeps_complete_items(self):
+        text = ('[{"number": 1, "title": "A", "characters": ["Ali", "Ayse"], "events": ["E1"]},'
+                '{"number": 2, "title": "B", "summ')
+        data = _recover_json(text)
+        self.assertEqual(data[0], {"number": 1, "title": "A", "characters": ["Ali", "Ayse"], "events": ["E1"]})
+        self.assertTrue(all(isinstance(item, dict) for item in data))
+
+    def test_truncated_array_never_returns_nested_list(self):
+        text = '```json\n[{"name": "Ali", "traits": ["cesur", "sadık"], "background": "Uzun bir geç'
+        data = _recover_json(text)
+        self.assertNotEqual(data, ["cesur", "sadık"])
+        self.assertTrue(all(isinstance(item, dict) for item in data))
+
+    def test_no_array_raises(self):
+        with self.assertRaises(json.JSONDecodeError):
+            _recover_json("JSON üretilemedi.")
+
+    def test_require_objects_rejects_non_objects(self):
+        with self.assertRaises(json.JSONDecodeError):
+            _require_objects(["Ali", "Ayse"], '["Ali", "Ayse"]')
+        with self.assertRaises(json.JSONDecodeError):
+            _require_objects([], "[]")
+        self.assertEqual(_require_objects([{"a": 1}], '[{"a": 1}]'), [{"a": 1}])
+
+
+if __name__ == "__main__":
+    unittest.main()